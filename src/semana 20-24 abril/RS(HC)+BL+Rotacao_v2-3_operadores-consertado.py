@@ -2,9 +2,21 @@ import os
 import time
 import random
 import math
+import signal
+import pickle
+import json
+from bisect import insort, bisect_left
+from collections import deque, OrderedDict
+try:
+    import numpy as np
+except ImportError: # sem NumPy o modo bitmap fica desligado
+    np = None
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from datetime import datetime
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
 
 # --- Estrutura de Dados ---
 class Item:
@@ -65,22 +77,312 @@ def preparar_pasta(nome_teste):
     
     return caminho_completo
 
+# --- Registro Compacto das Peças ---
+# Os motores não criam mais um dict por peça colocada: a geometria fica numa
+# lista de tuplas (x1, y1, x2, y2), que é o formato mais rápido de percorrer
+# no teste de sobreposição, e id/valor/rotação ficam em vetores paralelos
+# (array). Os dicts só são montados em layout(), para o desenho e o relatório.
+class RegistroPecas:
+    def __init__(self):
+        self.retangulos = []
+        self.ids = array('i')
+        self.valores_pecas = array('q')
+        self.rotacoes = array('b')
+
+    def colocar(self, item, x, y, w, h, is_rotated):
+        self.retangulos.append((x, y, x + w, y + h))
+        self.ids.append(item.id)
+        self.valores_pecas.append(item.v)
+        self.rotacoes.append(is_rotated)
+
+    def layout(self):
+        # Mesmo formato de dict que os motores sempre devolveram
+        return [
+            {'id': id, 'x': x1, 'y': y1, 'w': x2 - x1, 'h': y2 - y1, 'v': v, 'rotated': bool(rot)}
+            for (x1, y1, x2, y2), id, v, rot in zip(self.retangulos, self.ids, self.valores_pecas, self.rotacoes)
+        ]
+
+# --- Decodificação Incremental ---
+# Guarda o estado do posicionamento depois de cada posição k da permutação:
+# quantas peças já estavam colocadas e as somas acumuladas até ali. Um vizinho
+# que só difere da solução atual a partir da posição k reaproveita esse
+# prefixo e é decodificado a partir de k, em vez de desde o item 0.
+class RastroDecodificacao(RegistroPecas):
+    def __init__(self):
+        super().__init__()
+        self.colocados = [0]  # nº de peças colocadas após as k primeiras posições
+        self.areas = [0]
+        self.valores = [0]
+        self.dispersoes = [0]
+
+    def prefixo(self, inicio):
+        # Cópia do estado até a posição 'inicio' (as tuplas em si são compartilhadas)
+        novo = RastroDecodificacao()
+        m = self.colocados[inicio]
+        novo.retangulos = self.retangulos[:m]
+        novo.ids = self.ids[:m]
+        novo.valores_pecas = self.valores_pecas[:m]
+        novo.rotacoes = self.rotacoes[:m]
+        novo.colocados = self.colocados[:inicio + 1]
+        novo.areas = self.areas[:inicio + 1]
+        novo.valores = self.valores[:inicio + 1]
+        novo.dispersoes = self.dispersoes[:inicio + 1]
+        return novo
+
+# --- Grade Espacial ---
+# Divide o contêiner em células quadradas e guarda em cada célula as peças que
+# a tocam. O teste de sobreposição só olha as peças das células que o
+# retângulo candidato cobre, em vez de percorrer todas as peças colocadas.
+class GradeEspacial:
+    def __init__(self, tamanho_celula):
+        self.tamanho = max(1, int(tamanho_celula))
+        self.celulas = {} # (coluna, linha) -> lista de (x1, y1, x2, y2)
+
+    def inserir(self, ret):
+        # ret = (x1, y1, x2, y2), a mesma tupla guardada no registro das peças
+        t = self.tamanho
+        for gx in range(ret[0] // t, (ret[2] - 1) // t + 1):
+            for gy in range(ret[1] // t, (ret[3] - 1) // t + 1):
+                self.celulas.setdefault((gx, gy), []).append(ret)
+
+    def colide(self, x, y, w, h):
+        t = self.tamanho
+        x2, y2 = x + w, y + h
+        for gx in range(x // t, (x2 - 1) // t + 1):
+            for gy in range(y // t, (y2 - 1) // t + 1):
+                for px1, py1, px2, py2 in self.celulas.get((gx, gy), ()):
+                    if x < px2 and px1 < x2 and y < py2 and py1 < y2:
+                        return True
+        return False
+
+def criar_grade(permutation, retangulos):
+    # Célula do tamanho da mediana das dimensões dos itens
+    dims = sorted(d for item in permutation for d in (item.w, item.h))
+    grade = GradeEspacial(dims[len(dims) // 2] if dims else 1)
+    for ret in retangulos:
+        grade.inserir(ret)
+    return grade
+
+# --- Pontos Candidatos ---
+# Em vez de refazer e reordenar a lista de pontos candidatos a cada peça, ela
+# é mantida em ordem de uma peça para a outra: cada peça colocada acrescenta
+# os seus dois cantos e apaga os pontos que ficaram debaixo dela (ali nenhuma
+# peça cabe mais). Pontos fora do contêiner ou já cobertos nem entram.
+def _chave_ponto(ponto):
+    # Ordem do Bottom-Left: menor y, depois menor x
+    return (ponto[1], ponto[0])
+
+class PontosCandidatos:
+    def __init__(self, container_w, container_h):
+        self.W = container_w
+        self.H = container_h
+        self.lista = [] # (chave de ordenação, x, y), sempre ordenada
+        self.pontos = set()
+
+    def adicionar(self, x, y, colide):
+        if x >= self.W or y >= self.H or (x, y) in self.pontos or colide(x, y, 1, 1):
+            return
+        self.pontos.add((x, y))
+        insort(self.lista, (_chave_ponto((x, y)), x, y))
+
+    def cobrir(self, x, y, w, h):
+        # A chave começa pelo y, então os pontos com y em [y, y+h) são contíguos
+        ini = bisect_left(self.lista, ((y,),))
+        fim = bisect_left(self.lista, ((y + h,),))
+        restantes = []
+        for ponto in self.lista[ini:fim]:
+            if x <= ponto[1] < x + w:
+                self.pontos.discard((ponto[1], ponto[2]))
+            else:
+                restantes.append(ponto)
+        self.lista[ini:fim] = restantes
+
+# --- Corte Antecipado ---
+# O recozimento já sabe, antes de decodificar, o score mínimo ('limiar') que o
+# vizinho precisa passar para ser aceito. Durante a decodificação o score final
+# não passa de: valor atual + o que as peças restantes ainda podem somar -
+# dispersão atual (a dispersão só cresce). O que as restantes podem somar é
+# limitado pela soma dos valores delas e pela área livre vezes a maior razão
+# valor/área. Se nem essa cota passa do limiar, a decodificação para ali e
+# devolve score -inf (o rastro fica incompleto e não deve ser reaproveitado).
+# Na prática o teste vira "restante < falta", onde 'falta' é o quanto as peças
+# restantes ainda precisam somar; ela só muda quando uma peça é colocada.
+def _cota_inicial(permutation, inicio):
+    # Soma dos valores e maior razão valor/área das peças de 'inicio' em diante
+    restante = 0
+    razao = 0.0
+    for k in range(inicio, len(permutation)):
+        item = permutation[k]
+        restante += item.v
+        if item.v > razao * item.area:
+            razao = item.v / item.area
+    return restante, razao
+
+# --- Bitmap de Ocupação (contêineres pequenos) ---
+# Para contêineres inteiros pequenos (ngcut, cgcut1, ed*), guarda uma matriz
+# de ocupação e a sua tabela de somas acumuladas (summed-area table). Com ela,
+# "a janela w x h a partir de (x, y) está livre?" vira uma conta O(1), e o
+# NumPy testa todas as posições de uma vez. Só os pontos candidatos do
+# Bottom-Left são aceitos, então as posições são as mesmas do modo normal.
+# Usa o bitmap automaticamente se W*H <= LIMITE_BITMAP. Começa desligado: nas
+# instâncias atuais (até ~30 peças) o custo fixo das chamadas do NumPy ainda é
+# maior que o laço em Python puro (ngcut: ~0.35ms contra ~0.15ms por
+# decodificação; ed2 empata). Vale ligar (ex: 1000) para instâncias pequenas
+# com muitas peças, ou passar usar_bitmap=True direto no decodificador.
+LIMITE_BITMAP = 0
+
+def _bitmap_somas(ocupacao):
+    # S[y, x] = nº de células ocupadas no retângulo [0, x) x [0, y)
+    S = np.zeros((ocupacao.shape[0] + 1, ocupacao.shape[1] + 1), dtype=np.int32)
+    S[1:, 1:] = ocupacao.cumsum(axis=0).cumsum(axis=1)
+    return S
+
+def _bitmap_primeiro_ponto(mascara):
+    # A ordem (y, x) do Bottom-Left é a própria ordem das linhas da matriz
+    indice = int(mascara.argmax())
+    if not mascara.flat[indice]:
+        return None
+    cy, cx = divmod(indice, mascara.shape[1])
+    return cx, cy
+
+def _bitmap_incremental(permutation, container_w, container_h, rastro, inicio, limiar=None):
+    total_area_ocupada = rastro.areas[-1]
+    total_valor_objeto = rastro.valores[-1]
+    dispersao = rastro.dispersoes[-1]
+
+    # Reconstrói a ocupação e os pontos candidatos a partir do prefixo
+    ocupacao = np.zeros((container_h, container_w), dtype=np.int32)
+    candidatos = np.zeros((container_h + 1, container_w + 1), dtype=bool)
+    candidatos[0, 0] = True
+    for x1, y1, x2, y2 in rastro.retangulos:
+        ocupacao[y1:y2, x1:x2] = 1
+        candidatos[y1, x2] = True
+        candidatos[y2, x1] = True
+    S = _bitmap_somas(ocupacao)
+    if limiar is not None:
+        restante, razao = _cota_inicial(permutation, inicio)
+        falta = limiar - total_valor_objeto + dispersao * 0.0001
+        if restante < falta or razao * (container_w * container_h - total_area_ocupada) < falta:
+            return float('-inf'), rastro, total_area_ocupada, total_valor_objeto
+
+    for k in range(inicio, len(permutation)):
+        item = permutation[k]
+
+        # Se não sobra área livre para a peça, ela não cabe em lugar nenhum
+        ponto = None
+        if item.area <= container_w * container_h - int(S[-1, -1]):
+            orientacoes = list({
+                (item.w, item.h, False), # Orientação Original
+                (item.h, item.w, True)   # Orientação Rotacionada (90 graus)
+            })
+
+            # Todas as janelas livres da orientação, restritas aos pontos candidatos
+            for current_w, current_h, is_rotated in orientacoes:
+                if current_w > container_w or current_h > container_h:
+                    continue
+                ny, nx = container_h - current_h + 1, container_w - current_w + 1
+                ocupadas = S[current_h:, current_w:] - S[:ny, current_w:]
+                ocupadas -= S[current_h:, :nx]
+                ocupadas += S[:ny, :nx]
+                livre = (ocupadas == 0) & candidatos[:ny, :nx]
+
+                # Fica com a orientação de menor chave; no empate, a primeira
+                achado = _bitmap_primeiro_ponto(livre)
+                if achado is not None and (ponto is None or _chave_ponto(achado) < _chave_ponto(ponto)):
+                    ponto = achado
+                    escolha = (current_w, current_h, is_rotated)
+
+        if ponto is not None:
+            cx, cy = ponto
+            current_w, current_h, is_rotated = escolha
+
+            rastro.colocar(item, cx, cy, current_w, current_h, is_rotated)
+            total_area_ocupada += item.area
+            total_valor_objeto += item.v
+            dispersao += cx + current_w + cy + current_h
+
+            ocupacao[cy:cy + current_h, cx:cx + current_w] = 1
+            candidatos[cy, cx + current_w] = True
+            candidatos[cy + current_h, cx] = True
+            S = _bitmap_somas(ocupacao)
+
+        rastro.colocados.append(len(rastro.retangulos))
+        rastro.areas.append(total_area_ocupada)
+        rastro.valores.append(total_valor_objeto)
+        rastro.dispersoes.append(dispersao)
+
+        if limiar is not None:
+            restante -= item.v
+            if ponto is not None:
+                falta = limiar - total_valor_objeto + dispersao * 0.0001
+                if razao * (container_w * container_h - total_area_ocupada) < falta:
+                    return float('-inf'), rastro, total_area_ocupada, total_valor_objeto
+            if restante < falta:
+                return float('-inf'), rastro, total_area_ocupada, total_valor_objeto
+
+    score_avaliacao = total_valor_objeto - (dispersao * 0.0001)
+    return score_avaliacao, rastro, total_area_ocupada, total_valor_objeto
+
 # --- Bottom-Left (BL) ---
-def bottom_left_placement(permutation, container_w, container_h):
-    placed_items = []
-    total_area_ocupada = 0 # rastreia a área física
-    total_valor_objeto = 0 # rastreia o valor (objetivo)
+def bottom_left_placement(permutation, container_w, container_h, usar_grade=False, usar_bitmap=None, apenas_score=False):
+    score, rastro, area, valor = bottom_left_incremental(permutation, container_w, container_h,
+                                                         usar_grade=usar_grade, usar_bitmap=usar_bitmap)
+    # Só score: não monta a lista de itens (vem None), que só serve para o desenho
+    if apenas_score:
+        return score, None, area, valor
+    # retorna 4 valores: score, itens colocados, área fisica e valor
+    return score, rastro.layout(), area, valor
+
+def bottom_left_incremental(permutation, container_w, container_h, base=None, inicio=0, usar_grade=False, usar_bitmap=None, limiar=None):
+    # 'base' é o rastro de uma permutação igual a esta nas posições [0, inicio).
+    # Devolve o próprio rastro no lugar da lista de itens (use rastro.layout())
+    # Com 'limiar', para assim que o score não tiver como passar dele (ver Corte Antecipado)
+    if base is not None and inicio > 0:
+        rastro = base.prefixo(inicio)
+    else:
+        rastro = RastroDecodificacao()
+        inicio = 0
+
+    # usar_bitmap=None escolhe sozinho: bitmap só em contêineres pequenos
+    if usar_bitmap is None:
+        usar_bitmap = np is not None and container_w * container_h <= LIMITE_BITMAP
+    if usar_bitmap:
+        return _bitmap_incremental(permutation, container_w, container_h, rastro, inicio, limiar)
+
+    retangulos = rastro.retangulos
+    total_area_ocupada = rastro.areas[-1] # rastreia a área física
+    total_valor_objeto = rastro.valores[-1] # rastreia o valor (objetivo)
+    dispersao = rastro.dispersoes[-1]
+
+    # Grade espacial opcional para o teste de sobreposição
+    grade = criar_grade(permutation, retangulos) if usar_grade else None
+
+    def colide(x, y, w, h):
+        if grade is not None:
+            return grade.colide(x, y, w, h)
+        x2, y2 = x + w, y + h
+        for px1, py1, px2, py2 in retangulos:
+            if x < px2 and px1 < x2 and y < py2 and py1 < y2:
+                return True
+        return False
+
+    # Pontos candidatos mantidos em ordem de uma peça para a outra
+    candidatos = PontosCandidatos(container_w, container_h)
+    candidatos.adicionar(0, 0, colide)
+    for x1, y1, x2, y2 in retangulos:
+        candidatos.adicionar(x2, y1, colide)
+        candidatos.adicionar(x1, y2, colide)
     
-    for item in permutation:
-        candidates = [(0, 0)]
-        for p in placed_items:
-            candidates.append((p['x'] + p['w'], p['y']))
-            candidates.append((p['x'], p['y'] + p['h']))
-        
-        candidates.sort(key=lambda c: (c[1], c[0]))
-        
+    if limiar is not None:
+        restante, razao = _cota_inicial(permutation, inicio)
+        falta = limiar - total_valor_objeto + dispersao * 0.0001
+        if restante < falta or razao * (container_w * container_h - total_area_ocupada) < falta:
+            return float('-inf'), rastro, total_area_ocupada, total_valor_objeto
+
+    for k in range(inicio, len(permutation)):
+        item = permutation[k]
         placed = False
-        for cx, cy in candidates:
+        for _, cx, cy in candidatos.lista:
             
             # Define as orientações possíveis (usando set para evitar testar 2x se w == h)
             orientacoes = list({
@@ -93,127 +395,1118 @@ def bottom_left_placement(permutation, container_w, container_h):
                 
                 # Verifica se a peça (na orientação atual) não vaza do contêiner
                 if cx + current_w <= container_w and cy + current_h <= container_h:
-                    overlap = False
-                    
                     # Verifica colisão com as peças já posicionadas
-                    for p in placed_items:
-                        if not (cx + current_w <= p['x'] or cx >= p['x'] + p['w'] or
-                                cy + current_h <= p['y'] or cy >= p['y'] + p['h']):
-                            overlap = True
-                            break
+                    overlap = colide(cx, cy, current_w, current_h)
                     
                     # Se couber perfeitamente, registra a peça
                     if not overlap:
-                        placed_items.append({
-                            'id': item.id, 
-                            'x': cx, 
-                            'y': cy, 
-                            'w': current_w,   # Salva a largura final usada
-                            'h': current_h,   # Salva a altura final usada
-                            'v': item.v,
-                            'rotated': is_rotated # Registra se precisou girar
-                        })
+                        rastro.colocar(item, cx, cy, current_w, current_h, is_rotated)
                         
                         total_area_ocupada += item.area # sempre será <= área do container
                         total_valor_objeto += item.v # pode ser > que o container se o modo for valor
+                        dispersao += cx + current_w + cy + current_h
+                        if grade is not None:
+                            grade.inserir(retangulos[-1])
+                        candidatos.cobrir(cx, cy, current_w, current_h)
+                        candidatos.adicionar(cx + current_w, cy, colide)
+                        candidatos.adicionar(cx, cy + current_h, colide)
                         placed = True
                         break # Peça colocada, quebra o loop de orientações
             
             if placed:
                 break # Quebra o loop de candidatos e vai para o próximo item
+
+        # Marca o estado depois da posição k
+        rastro.colocados.append(len(retangulos))
+        rastro.areas.append(total_area_ocupada)
+        rastro.valores.append(total_valor_objeto)
+        rastro.dispersoes.append(dispersao)
+
+        if limiar is not None:
+            restante -= item.v
+            if placed:
+                falta = limiar - total_valor_objeto + dispersao * 0.0001
+                if razao * (container_w * container_h - total_area_ocupada) < falta:
+                    return float('-inf'), rastro, total_area_ocupada, total_valor_objeto
+            if restante < falta:
+                return float('-inf'), rastro, total_area_ocupada, total_valor_objeto
     
-    # Cálculo do score e dispersão
-    dispersao = sum(p['x'] + p['w'] + p['y'] + p['h'] for p in placed_items)
+    # Cálculo do score (a dispersão é somada conforme as peças são colocadas)
+    score_avaliacao = total_valor_objeto - (dispersao * 0.0001)
+
+    return score_avaliacao, rastro, total_area_ocupada, total_valor_objeto
+
+# --- Skyline (Contorno) ---
+# Alternativa ao Bottom-Left por pontos candidatos: em vez de varrer todos os
+# itens já colocados, guarda só o contorno superior do empacotamento como uma
+# lista de segmentos [x, largura, altura] ordenados por x. A regra continua
+# sendo a do Bottom-Left (menor y, depois menor x), mas buracos que ficam
+# abaixo do contorno não são mais revisitados.
+def _skyline_melhor_posicao(skyline, w, h, container_w, container_h):
+    melhor = None
+    janela = deque() # índices dos segmentos cobertos pela peça, alturas decrescentes
+    r = 0
+
+    for i in range(len(skyline)):
+        x = skyline[i][0]
+        if x + w > container_w:
+            break # a partir daqui a peça vaza pela direita
+
+        # Janela deslizante: segmentos que a peça cobre começando em x
+        while r < len(skyline) and skyline[r][0] < x + w:
+            while janela and skyline[janela[-1]][2] <= skyline[r][2]:
+                janela.pop()
+            janela.append(r)
+            r += 1
+        while janela[0] < i:
+            janela.popleft()
+
+        # A peça apoia no segmento mais alto que ela cobre
+        y = skyline[janela[0]][2]
+        if y + h <= container_h and (melhor is None or (y, x) < melhor[:2]):
+            melhor = (y, x, i)
+
+    return melhor
+
+def _skyline_atualiza(skyline, i, x, w, topo):
+    fim = x + w
+
+    # Segmentos totalmente cobertos pela peça
+    j = i
+    while j < len(skyline) and skyline[j][0] + skyline[j][1] <= fim:
+        j += 1
+
+    # Segmento parcialmente coberto: sobra só a parte à direita da peça
+    if j < len(skyline) and skyline[j][0] < fim:
+        sx, sl, sy = skyline[j]
+        skyline[j] = [fim, sx + sl - fim, sy]
+
+    skyline[i:j] = [[x, w, topo]]
+
+    # Junta vizinhos com a mesma altura para o contorno não crescer à toa
+    if i + 1 < len(skyline) and skyline[i + 1][2] == topo:
+        skyline[i][1] += skyline[i + 1][1]
+        del skyline[i + 1]
+    if i > 0 and skyline[i - 1][2] == topo:
+        skyline[i - 1][1] += skyline[i][1]
+        del skyline[i]
+
+def skyline_placement(permutation, container_w, container_h, apenas_score=False):
+    skyline = [[0, container_w, 0]] # começa com um único segmento no chão
+    registro = None if apenas_score else RegistroPecas() # só score: nem guarda as peças
+    total_area_ocupada = 0
+    total_valor_objeto = 0
+    dispersao = 0
+
+    for item in permutation:
+        orientacoes = list({
+            (item.w, item.h, False), # Orientação Original
+            (item.h, item.w, True)   # Orientação Rotacionada (90 graus)
+        })
+
+        # Escolhe a orientação com a posição mais baixa (e mais à esquerda)
+        melhor = None
+        for current_w, current_h, is_rotated in orientacoes:
+            pos = _skyline_melhor_posicao(skyline, current_w, current_h, container_w, container_h)
+            if pos is not None and (melhor is None or pos[:2] < melhor[:2]):
+                melhor = pos + (current_w, current_h, is_rotated)
+
+        if melhor is None:
+            continue # a peça não cabe em nenhuma orientação
+
+        cy, cx, i, current_w, current_h, is_rotated = melhor
+        _skyline_atualiza(skyline, i, cx, current_w, cy + current_h)
+        if registro is not None:
+            registro.colocar(item, cx, cy, current_w, current_h, is_rotated)
+
+        total_area_ocupada += item.area
+        total_valor_objeto += item.v
+        dispersao += cx + current_w + cy + current_h
+
+    # Mesmo score do Bottom-Left, para os dois motores serem comparáveis
+    score_avaliacao = total_valor_objeto - (dispersao * 0.0001)
+
+    if registro is None:
+        return score_avaliacao, None, total_area_ocupada, total_valor_objeto
+    return score_avaliacao, registro.layout(), total_area_ocupada, total_valor_objeto
+
+# --- Retângulos Maximais (MaxRects) ---
+# Guarda o espaço livre do contêiner como uma lista de retângulos vazios
+# maximais (x, y, largura, altura), que podem se sobrepor entre si. Cada peça
+# vai para o retângulo livre onde sobra menos espaço (Best Short Side Fit),
+# sem precisar comparar com as peças já colocadas.
+def _maxrects_contido(a, b):
+    # True se o retângulo a está inteiro dentro de b
+    return (a[0] >= b[0] and a[1] >= b[1] and
+            a[0] + a[2] <= b[0] + b[2] and a[1] + a[3] <= b[1] + b[3])
+
+def _maxrects_divide(livres, x, y, w, h):
+    mantidos = []
+    gerados = []
+    for fx, fy, fw, fh in livres:
+        # Retângulo livre que não toca a peça continua igual
+        if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+            mantidos.append((fx, fy, fw, fh))
+            continue
+
+        # Sobras maximais em volta da peça
+        if x > fx:
+            gerados.append((fx, fy, x - fx, fh)) # esquerda
+        if x + w < fx + fw:
+            gerados.append((x + w, fy, fx + fw - (x + w), fh)) # direita
+        if y > fy:
+            gerados.append((fx, fy, fw, y - fy)) # baixo
+        if y + h < fy + fh:
+            gerados.append((fx, y + h, fw, fy + fh - (y + h))) # cima
+
+    # Descarta sobras contidas em outro retângulo livre (os mantidos já eram
+    # maximais entre si e não cabem dentro de uma sobra)
+    novos = []
+    for i, r in enumerate(gerados):
+        if any(_maxrects_contido(r, m) for m in mantidos):
+            continue
+        if any(_maxrects_contido(r, o) and (o != r or j < i) for j, o in enumerate(gerados) if j != i):
+            continue
+        novos.append(r)
+
+    return mantidos + novos
+
+def maximal_rectangles_placement(permutation, container_w, container_h, apenas_score=False):
+    livres = [(0, 0, container_w, container_h)]
+    registro = None if apenas_score else RegistroPecas() # só score: nem guarda as peças
+    total_area_ocupada = 0
+    total_valor_objeto = 0
+    dispersao = 0
+
+    for item in permutation:
+        orientacoes = list({
+            (item.w, item.h, False), # Orientação Original
+            (item.h, item.w, True)   # Orientação Rotacionada (90 graus)
+        })
+
+        # Procura o retângulo livre que a peça preenche melhor
+        melhor = None
+        for fx, fy, fw, fh in livres:
+            for current_w, current_h, is_rotated in orientacoes:
+                if current_w <= fw and current_h <= fh:
+                    sobra_x, sobra_y = fw - current_w, fh - current_h
+                    chave = (min(sobra_x, sobra_y), max(sobra_x, sobra_y), fy, fx)
+                    if melhor is None or chave < melhor[0]:
+                        melhor = (chave, fx, fy, current_w, current_h, is_rotated)
+
+        if melhor is None:
+            continue # a peça não cabe em nenhum espaço livre
+
+        _, cx, cy, current_w, current_h, is_rotated = melhor
+        livres = _maxrects_divide(livres, cx, cy, current_w, current_h)
+        if registro is not None:
+            registro.colocar(item, cx, cy, current_w, current_h, is_rotated)
+
+        total_area_ocupada += item.area
+        total_valor_objeto += item.v
+        dispersao += cx + current_w + cy + current_h
+
+    # Mesmo score dos outros motores
     score_avaliacao = total_valor_objeto - (dispersao * 0.0001)
 
-    # retorna 4 valores: score, itens colocados, área fisica e valor 
-    return score_avaliacao, placed_items, total_area_ocupada, total_valor_objeto
+    if registro is None:
+        return score_avaliacao, None, total_area_ocupada, total_valor_objeto
+    return score_avaliacao, registro.layout(), total_area_ocupada, total_valor_objeto
+
+# Motores que sabem continuar a decodificação a partir de um prefixo já calculado
+DECODIFICADORES_INCREMENTAIS = {
+    bottom_left_placement: bottom_left_incremental,
+}
+
+# --- Cache de Avaliações ---
+# O RS revisita muitas vezes a mesma permutação (trocas que se desfazem, o
+# refinamento da temperatura baixa, instâncias com poucas peças). O cache
+# guarda (score, área, valor) por ordem de ids e descarta a entrada usada há
+# mais tempo quando enche (LRU).
+class CacheLRU:
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self.entradas = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def buscar(self, chave):
+        resultado = self.entradas.get(chave)
+        if resultado is None:
+            self.faltas += 1
+            return None
+        self.entradas.move_to_end(chave)
+        self.acertos += 1
+        return resultado
+
+    def guardar(self, chave, resultado):
+        self.entradas[chave] = resultado
+        if len(self.entradas) > self.tamanho:
+            self.entradas.popitem(last=False)
+            self.descartes += 1
+
+# --- Memória Tabu ---
+# Na temperatura baixa o RS sorteia e decodifica os mesmos poucos vizinhos
+# várias vezes. A memória guarda o hash das últimas 'tamanho' permutações
+# avaliadas (a mais antiga sai quando enche); um vizinho que cair numa delas
+# é desfeito sem decodificar. Diferente do cache, não devolve o score: o
+# vizinho é pulado e o sorteio segue para o próximo.
+class MemoriaTabu:
+    def __init__(self, tamanho):
+        self.tamanho = tamanho
+        self.chaves = OrderedDict()
+        self.consultas = 0
+        self.acertos = 0
+
+    def visitada(self, ordem):
+        # True se a ordem está na memória; senão guarda ela e devolve False
+        chave = hash(tuple(item.id for item in ordem))
+        self.consultas += 1
+        if chave in self.chaves:
+            self.acertos += 1
+            return True
+        self.chaves[chave] = None
+        if len(self.chaves) > self.tamanho:
+            self.chaves.popitem(last=False)
+        return False
+
+# --- Eventos de Progresso ---
+# As meta-heurísticas e o lote não imprimem direto: mandam eventos (dicts)
+# para uma função 'progresso', e quem chama escolhe para onde eles vão. Com
+# progresso=None nenhum evento é montado. Tipos de evento:
+# - 'nivel': fim de um nível de temperatura do RS (passo, temperatura, score
+#   atual e melhor, taxa de aceitação, avaliações por segundo);
+# - 'instancia': início de uma instância no lote (nome);
+# - 'mensagem': texto livre, com a origem ('RS', 'PT', 'GA', 'LOTE'...).
+def progresso_console(evento):
+    # Mesmas linhas que os scripts sempre imprimiram
+    if evento['tipo'] == 'nivel':
+        print(f"    Passo {evento['passo']} | Temp: {evento['temperatura']:.2f} | Melhor Área: {evento['melhor']} | "
+              f"Aceitação: {evento['aceitacao']:.0%} | {evento['avaliacoes_por_s']:.0f} aval/s")
+    elif evento['tipo'] == 'instancia':
+        print(f"\n>>> Processando: {evento['nome']}")
+    else:
+        print(f"  [{evento['origem']}] {evento['texto']}")
+
+class ProgressoArquivo:
+    # Um evento por linha (JSON) no fim do arquivo, com o horário em que chegou
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def __call__(self, evento):
+        with open(self.caminho, 'a') as arq:
+            arq.write(json.dumps(dict(evento, hora=time.time())) + "\n")
+
+class ProgressoInterface:
+    # Repassa os eventos para 'atualizar' (ex: no app.py do Streamlit, uma função
+    # que mexe num st.progress/st.empty), com no máximo um evento 'nivel' a
+    # cada 'intervalo' segundos para não travar a interface
+    def __init__(self, atualizar, intervalo=0.5):
+        self.atualizar = atualizar
+        self.intervalo = intervalo
+        self.ultimo = float('-inf')
+
+    def __call__(self, evento):
+        agora = time.perf_counter()
+        if evento['tipo'] == 'nivel':
+            if agora - self.ultimo < self.intervalo:
+                return
+            self.ultimo = agora
+        self.atualizar(evento)
+
+class ProgressoCombinado:
+    # Manda cada evento para vários destinos (ex: console e arquivo)
+    def __init__(self, *destinos):
+        self.destinos = destinos
+
+    def __call__(self, evento):
+        for destino in self.destinos:
+            destino(evento)
+
+def _avisar(progresso, origem, texto):
+    if progresso is not None:
+        progresso({'tipo': 'mensagem', 'origem': origem, 'texto': texto})
 
 # --- Recozimento Simulado (SA) ---
-def recozimento_simulado(instance, t0=1000, alpha=0.95, iter_max=300):
+# Resfriamento adaptativo (resfriamento_adaptativo=True): mede a taxa de
+# aceitação de cada nível de temperatura. Fora da faixa_aceitacao o nível
+# quase não muda a busca (aceita quase tudo ou quase nada), então a
+# temperatura cai 3 níveis de uma vez. Com reaquecer_apos=n, depois de n
+# níveis sem melhorar o melhor score a temperatura volta 20 níveis (no
+# máximo MAX_REAQUECIMENTOS vezes, para o RS sempre terminar).
+MAX_REAQUECIMENTOS = 3
+
+# Critérios de parada antecipada (todos desligados por padrão):
+# - parar_sem_melhora=K: K níveis seguidos sem melhorar o melhor score;
+# - parar_completo: todas as peças colocadas ou o contêiner cheio, quando
+#   nenhuma ordem consegue mais valor (só a dispersão ainda mudaria);
+# - cota_superior: valor conhecido (ex: ótimo da literatura) já atingido.
+# O motivo da parada vai para relatorio['motivo_parada'].
+
+def criar_avaliador(instance, decoder=bottom_left_placement, incremental=True, usar_grade=False, corte_antecipado=True, tamanho_cache=0):
+    # Monta a função de avaliação usada pelas meta-heurísticas: escolhe o motor
+    # incremental (se houver), o corte antecipado e o cache de avaliações.
+    # Devolve avaliar, rastro_aceito e o cache (None se estiver desligado)
+    decoder_inc = DECODIFICADORES_INCREMENTAIS.get(decoder)
+    cache = CacheLRU(tamanho_cache) if tamanho_cache > 0 else None # tamanho_cache=0 desliga
+
+    def avaliar(ordem, base=None, inicio=0, limiar=None):
+        # Retorna score, área, valor e o rastro (None se o motor não for incremental)
+        # Com limiar, o score vem -inf se a decodificação for cortada no meio
+        if cache is not None:
+            chave = tuple(item.id for item in ordem)
+            guardado = cache.buscar(chave)
+            if guardado is not None:
+                score, area, valor = guardado
+                return score, area, valor, None # o cache não guarda o rastro
+        if decoder_inc is None:
+            score, _, area, valor = decoder(ordem, instance.W, instance.H, apenas_score=True)
+            rastro = None
+        else:
+            if not incremental:
+                base = None # decodifica sempre desde o item 0
+            if not corte_antecipado:
+                limiar = None
+            score, rastro, area, valor = decoder_inc(ordem, instance.W, instance.H, base, inicio, usar_grade, limiar=limiar)
+        # Decodificação cortada não tem o score de verdade, então não entra no cache
+        if cache is not None and score != float('-inf'):
+            cache.guardar(chave, (score, area, valor))
+        return score, area, valor, rastro
+
+    def rastro_aceito(ordem, rastro):
+        # Vizinho aceito que veio do cache não tem rastro: decodifica de novo
+        # para os próximos vizinhos continuarem reaproveitando o prefixo
+        if rastro is None and decoder_inc is not None and incremental:
+            rastro = decoder_inc(ordem, instance.W, instance.H, None, 0, usar_grade)[1]
+        return rastro
+
+    return avaliar, rastro_aceito, cache
+
+OPERADORES = ("swap", "2-opt", "insercao")
+PROBABILIDADES_OPERADORES = (0.4, 0.3, 0.3)
+
+# --- Sementes ---
+# Todos os sorteios do RS (roleta, aceitação, refinamento) saem de um gerador
+# 'rng' (random.Random) passado adiante; sem ele, usam o gerador global do
+# módulo random, como antes. Cadeias, réplicas e instâncias de um lote ganham
+# cada uma a sua semente, derivada da semente mestre e de um rótulo (ex:
+# "cadeia3", "gcut1.txt"): a mesma mestre sempre gera as mesmas sementes, e
+# o hash (sha512) do rótulo evita a correlação de sementes vizinhas (s, s+1...).
+def derivar_semente(semente_mestre, rotulo):
+    return random.Random(f"{semente_mestre}/{rotulo}").getrandbits(63)
+
+def aplicar_movimento(ordem, probabilidades=PROBABILIDADES_OPERADORES, rng=random):
+    # Roleta dos três operadores do RS, aplicada direto na lista 'ordem' (sem
+    # copiar). Devolve a primeira posição que mudou (as anteriores continuam
+    # iguais), o operador usado e o movimento, para desfazer_movimento
+    r = rng.random()
+    
+    if r < probabilidades[0]:
+        # 1. SWAP (40% de chance): Troca dois itens de lugar
+        i, j = rng.sample(range(len(ordem)), 2)
+        ordem[i], ordem[j] = ordem[j], ordem[i]
+        return min(i, j), 0, (0, i, j)
+        
+    elif r < probabilidades[0] + probabilidades[1]:
+        # 2. INVERSÃO / 2-Opt (30% de chance): Inverte um bloco de itens
+        i, j = sorted(rng.sample(range(len(ordem)), 2))
+        ordem[i:j+1] = reversed(ordem[i:j+1])
+        return i, 1, (1, i, j)
+        
+    else:
+        # 3. INSERÇÃO / Shift (30% de chance): Move um item para outra posição
+        idx_origem = rng.randrange(len(ordem))
+        item_removido = ordem.pop(idx_origem)
+        
+        idx_destino = rng.randrange(len(ordem) + 1)
+        ordem.insert(idx_destino, item_removido)
+        return min(idx_origem, idx_destino), 2, (2, idx_origem, idx_destino)
+
+def desfazer_movimento(ordem, movimento):
+    # Volta a lista ao estado de antes do aplicar_movimento
+    operador, a, b = movimento
+    if operador == 0:
+        ordem[a], ordem[b] = ordem[b], ordem[a]
+    elif operador == 1:
+        ordem[a:b+1] = reversed(ordem[a:b+1])
+    else:
+        ordem.insert(a, ordem.pop(b))
+
+def gerar_vizinho(current_order, probabilidades=PROBABILIDADES_OPERADORES, rng=random):
+    # Mesma roleta, mas num vizinho novo (a ordem atual fica intacta)
+    neighbor = list(current_order)
+    inicio, operador, _ = aplicar_movimento(neighbor, probabilidades, rng)
+    return neighbor, inicio, operador
+
+# --- Roleta Adaptativa (Adaptive Pursuit) ---
+# Em vez dos 40/30/30% fixos, cada operador ganha uma nota: a média móvel
+# da melhora que ele traz sobre o score atual por segundo de decodificação.
+# A cada uso, a probabilidade do operador de melhor nota anda uma fração
+# 'beta' na direção de p_max e as outras na direção de p_min, de modo que
+# nenhum operador some da roleta.
+class RoletaAdaptativa:
+    def __init__(self, probabilidades=PROBABILIDADES_OPERADORES, p_min=0.05, beta=0.1, taxa=0.1):
+        self.probabilidades = list(probabilidades)
+        self.notas = [0.0] * len(probabilidades)
+        self.p_min = p_min
+        self.p_max = 1 - (len(probabilidades) - 1) * p_min
+        self.beta = beta
+        self.taxa = taxa
+
+    def registrar(self, operador, melhora, duracao):
+        recompensa = melhora / duracao if duracao > 0 else 0.0
+        self.notas[operador] += self.taxa * (recompensa - self.notas[operador])
+
+        melhor = max(range(len(self.notas)), key=self.notas.__getitem__)
+        if self.notas[melhor] <= 0:
+            return # nenhum operador melhorou nada ainda
+        for k in range(len(self.probabilidades)):
+            alvo = self.p_max if k == melhor else self.p_min
+            self.probabilidades[k] += self.beta * (alvo - self.probabilidades[k])
+
+# --- Busca Local (primeira melhora com "don't look bits") ---
+# Refinamento do RS entre os níveis de temperatura e no fim. Percorre os
+# itens da ordem e, para cada um, testa as trocas com todas as outras posições
+# e depois as inserções em todas as outras posições (sem repetir as inserções
+# em i-1/i+1, que são trocas com o vizinho); fica com a primeira que melhorar
+# o score. Cada vizinho é decodificado a partir da primeira posição mudada, com
+# o score atual como limiar do corte antecipado. Um item que não melhorou com
+# nenhum movimento ganha o "não olhar" na posição em que estava e só é testado
+# de novo quando mudar de lugar. O "não olhar" e a posição onde a busca parou
+# (cursor) continuam de uma chamada para a outra dentro do mesmo RS.
+class BuscaLocal:
+    def __init__(self, avaliar, rastro_aceito, parar=None):
+        self.avaliar = avaliar
+        self.rastro_aceito = rastro_aceito
+        self.parar = parar # função sem argumentos; True interrompe a busca (ex: tempo esgotado)
+        self.nao_olhar = {} # id do item -> posição em que ele não melhorou
+        self.cursor = 0
+
+    @staticmethod
+    def _movimentos(i, n):
+        for j in range(i + 1, n):
+            yield 0, j
+        for j in range(i):
+            yield 0, j
+        for j in range(n):
+            if abs(j - i) > 1:
+                yield 2, j
+
+    def executar(self, ordem, score, area, valor, rastro, max_avaliacoes=None):
+        # Melhora 'ordem' no lugar até um ótimo local ou até max_avaliacoes
+        # decodificações. Devolve score, área, valor, rastro, avaliações e melhorias
+        n = len(ordem)
+        avaliacoes = melhorias = 0
+        if n < 2:
+            return score, area, valor, rastro, avaliacoes, melhorias
+        i = self.cursor % n
+        sem_melhora = 0 # itens seguidos sem melhora; n seguidos = ótimo local
+        while sem_melhora < n:
+            item = ordem[i]
+            if self.nao_olhar.get(item.id) == i:
+                sem_melhora += 1
+                i = (i + 1) % n
+                continue
+
+            melhorou = False
+            for operador, j in self._movimentos(i, n):
+                if (max_avaliacoes is not None and avaliacoes >= max_avaliacoes) or (self.parar is not None and self.parar()):
+                    self.cursor = i
+                    return score, area, valor, rastro, avaliacoes, melhorias
+                if operador == 0:
+                    ordem[i], ordem[j] = ordem[j], ordem[i]
+                else:
+                    ordem.insert(j, ordem.pop(i))
+                nev, narea, nval, nrastro = self.avaliar(ordem, rastro, min(i, j), score)
+                avaliacoes += 1
+                if nev > score:
+                    score, area, valor = nev, narea, nval
+                    rastro = self.rastro_aceito(ordem, nrastro)
+                    melhorias += 1
+                    melhorou = True
+                    break
+                desfazer_movimento(ordem, (operador, i, j))
+
+            if melhorou:
+                sem_melhora = 0 # testa o item que chegou na posição i
+            else:
+                self.nao_olhar[item.id] = i
+                sem_melhora += 1
+                i = (i + 1) % n
+        self.cursor = i
+        return score, area, valor, rastro, avaliacoes, melhorias
+
+def calibrar_temperaturas(avaliar, ordem, score, rastro, aceitacao_inicial=0.8, aceitacao_final=None, amostras=100, rng=random,
+                          parar=None):
+    # Sorteia vizinhos da ordem inicial e mede quanto pioram o score. Uma piora
+    # média d é aceita com probabilidade p na temperatura t = -d / ln(p), então
+    # dá para escolher t0 (e t_final) pela aceitação desejada, na escala do
+    # objetivo de cada instância (ed1 ~ 38, lu4 ~ 10^8).
+    # 'parar' (função sem argumentos) encerra a amostragem antes, com o que já tiver
+    pioras = []
+    for _ in range(amostras):
+        if parar is not None and parar():
+            break
+        vizinho, inicio, _ = gerar_vizinho(ordem, rng=rng)
+        nev = avaliar(vizinho, rastro, inicio)[0]
+        if nev < score:
+            pioras.append(score - nev)
+    if not pioras:
+        return None, None # só vizinhos neutros ou melhores: a temperatura não faz diferença
+
+    piora_media = sum(pioras) / len(pioras)
+    t0 = -piora_media / math.log(aceitacao_inicial)
+    t_final = -piora_media / math.log(aceitacao_final) if aceitacao_final is not None else None
+    return t0, t_final
+
+# --- Checkpoint do RS ---
+# Em rodadas longas (famílias lu/lw) o RS grava de tempos em tempos o seu
+# estado num arquivo: ordens atual e melhor (como ids), temperatura, passo,
+# contadores e o estado do gerador aleatório. Se o arquivo já existir quando
+# o RS começa, ele continua do último nível gravado em vez de recomeçar.
+# A gravação vai para um temporário que depois troca de nome, para uma
+# interrupção no meio não deixar um checkpoint pela metade.
+def salvar_checkpoint(caminho, estado):
+    temporario = caminho + ".tmp"
+    with open(temporario, 'wb') as arq:
+        pickle.dump(estado, arq)
+    os.replace(temporario, caminho)
+
+def carregar_checkpoint(caminho):
+    if caminho is None or not os.path.exists(caminho):
+        return None
+    with open(caminho, 'rb') as arq:
+        return pickle.load(arq)
+
+def recozimento_simulado(instance, t0=1000, alpha=0.95, iter_max=300, decoder=bottom_left_placement, incremental=True, usar_grade=False, corte_antecipado=True, tamanho_cache=0, tempo_limite=None,
+                         resfriamento_adaptativo=False, faixa_aceitacao=(0.02, 0.6), reaquecer_apos=None, historico=None,
+                         t_final=1.0, calibrar_t0=False, aceitacao_inicial=0.8, aceitacao_final=None,
+                         roleta_adaptativa=False, relatorio=None,
+                         parar_sem_melhora=None, parar_completo=False, cota_superior=None,
+                         checkpoint=None, intervalo_checkpoint=60,
+                         semente=None, busca_local_a_cada=10, avaliacoes_busca_local=300,
+                         busca_local_final=True, avaliacoes_busca_final=3000,
+                         memoria_tabu=0,
+                         progresso=progresso_console, progresso_a_cada=5):
+    # Com 'semente', o RS tem o seu próprio gerador e a mesma semente repete a
+    # rodada (exceto com roleta_adaptativa ou tempo_limite, que dependem do relógio)
+    rng = random.Random(semente) if semente is not None else random
+
+    # Com tempo_limite (segundos), o resfriamento segue o relógio em vez de
+    # alpha: a mesma curva geométrica de t0 até t_final, percorrida dentro do
+    # orçamento. A temperatura é recalculada a cada movimento, porque nas
+    # instâncias grandes um nível inteiro pode levar boa parte do orçamento.
+    # O relógio começa antes da decodificação inicial e da calibração, que
+    # também gastam o orçamento
+    inicio_rs = time.perf_counter()
+    def tempo_esgotado():
+        return tempo_limite is not None and time.perf_counter() - inicio_rs >= tempo_limite
+
+    def temperatura_no_tempo():
+        fracao = (time.perf_counter() - inicio_rs) / tempo_limite
+        return t0 * (t_final / t0) ** fracao if fracao < 1 else t_final
+
+    avaliar, rastro_aceito, cache = criar_avaliador(instance, decoder, incremental, usar_grade,
+                                                    corte_antecipado, tamanho_cache)
+
     current_order = list(instance.items)
     # random.shuffle(current_order)
     current_order.sort(key=lambda x: x.area, reverse=True)
 
-    current_eval, _, cur_area, cur_val = bottom_left_placement(current_order, instance.W, instance.H)
+    # Retomada: a ordem atual vem do checkpoint e é decodificada de novo (o rastro não é salvo)
+    estado = carregar_checkpoint(checkpoint)
+    if estado is not None:
+        por_id = {item.id: item for item in instance.items}
+        current_order = [por_id[i] for i in estado['ordem_atual']]
+
+    current_eval, cur_area, cur_val, current_rastro = avaliar(current_order)
     
     best_order = list(current_order)
     best_eval = current_eval
     best_area = cur_area # Guarda a melhor área física
     best_val = cur_val # guarda o melhor valor bruto
     
+    # Calibração: troca t0 pela temperatura com a aceitação inicial desejada.
+    # Sem aceitacao_final, t_final acompanha t0 na mesma proporção de antes
+    # (t0/t_final), para o número de níveis continuar o mesmo
+    if calibrar_t0 and estado is None:
+        # Com orçamento de tempo, a calibração fica com no máximo 10% dele
+        def parar_calibracao():
+            return tempo_limite is not None and time.perf_counter() - inicio_rs >= 0.1 * tempo_limite
+        t0_calibrado, t_final_calibrado = calibrar_temperaturas(avaliar, current_order, current_eval, current_rastro,
+                                                                aceitacao_inicial, aceitacao_final, rng=rng,
+                                                                parar=parar_calibracao)
+        if t0_calibrado is not None:
+            t_final = t_final_calibrado if t_final_calibrado is not None else t_final * t0_calibrado / t0
+            t0 = t0_calibrado
+            _avisar(progresso, "RS", f"Temperaturas calibradas: t0 = {t0:.4f}, t_final = {t_final:.6f}")
+
     t = t0
     step = 0
-    print(f"  [RS] Iniciando Otimização. Temperatura Inicial: {t0}")
+    _avisar(progresso, "RS", f"Iniciando Otimização. Temperatura Inicial: {t0}")
 
-    while t > 1.0:
-        for _ in range(iter_max):
+    # 'historico' (lista) recebe (passo, temperatura, taxa de aceitação, melhor) de cada nível
+    niveis_sem_melhora = 0
+    area_pecas = sum(item.area for item in instance.items)
+    motivo_parada = "temperatura final"
+    reaquecimentos = 0
 
-            neighbor = list(current_order)
+    # Uso de cada operador (roleta fixa ou adaptativa); vai para o 'relatorio' (dict) no fim
+    roleta = RoletaAdaptativa() if roleta_adaptativa else None
+    uso = {nome: {'chamadas': 0, 'aceitos': 0, 'melhorias': 0, 'tempo': 0.0} for nome in OPERADORES}
 
-            # Roleta para escolha do operador
-            r = random.random()
-            
-            if r < 0.4:
-                # 1. SWAP (40% de chance): Troca dois itens de lugar
-                i, j = random.sample(range(len(neighbor)), 2)
-                neighbor[i], neighbor[j] = neighbor[j], neighbor[i]
-                
-            elif r < 0.7:
-                # 2. INVERSÃO / 2-Opt (30% de chance): Inverte um bloco de itens
-                i, j = sorted(random.sample(range(len(neighbor)), 2))
-                neighbor[i:j+1] = reversed(neighbor[i:j+1])
-                
-            else:
-                # 3. INSERÇÃO / Shift (30% de chance): Move um item para outra posição
-                idx_origem = random.randrange(len(neighbor))
-                item_removido = neighbor.pop(idx_origem)
-                
-                idx_destino = random.randrange(len(neighbor) + 1)
-                neighbor.insert(idx_destino, item_removido)
-            
-            # Avalia o novo vizinho
-            nev, _, narea, nval = bottom_left_placement(neighbor, instance.W, instance.H)
+    # Busca local a cada 'busca_local_a_cada' níveis (None desliga) e no melhor
+    # do fim; cada etapa com a sua contagem, também no 'relatorio'
+    busca = BuscaLocal(avaliar, rastro_aceito, tempo_esgotado)
+    etapas_busca = {etapa: {'chamadas': 0, 'avaliacoes': 0, 'melhorias': 0, 'melhora': 0.0, 'tempo': 0.0}
+                    for etapa in ("niveis", "final")}
+
+    # Memória tabu com as últimas 'memoria_tabu' permutações avaliadas (0 desliga)
+    tabu = MemoriaTabu(memoria_tabu) if memoria_tabu > 0 else None
+    if tabu is not None:
+        tabu.visitada(current_order)
+
+    if estado is not None:
+        best_order = [por_id[i] for i in estado['melhor_ordem']]
+        best_eval, best_area, best_val = estado['melhor']
+        t0, t_final, t, step = estado['t0'], estado['t_final'], estado['t'], estado['passo']
+        niveis_sem_melhora, reaquecimentos = estado['niveis_sem_melhora'], estado['reaquecimentos']
+        uso = estado['uso']
+        if roleta is not None:
+            roleta.probabilidades, roleta.notas = estado['roleta']
+        if historico is not None:
+            historico[:] = estado['historico']
+        busca.nao_olhar, busca.cursor, etapas_busca['niveis'] = estado['busca_local']
+        if tabu is not None and estado['tabu'] is not None:
+            chaves, tabu.consultas, tabu.acertos = estado['tabu']
+            tabu.chaves = OrderedDict.fromkeys(chaves)
+        inicio_rs -= estado['decorrido'] # o orçamento de tempo continua contando de onde parou
+        rng.setstate(estado['aleatorio'])
+        _avisar(progresso, "RS", f"Retomando do checkpoint: passo {step} | Temp: {t:.2f} | Melhor Área: {best_eval}")
+    ultimo_checkpoint = time.perf_counter()
+
+    while t > t_final:
+        inicio_nivel = time.perf_counter()
+        melhor_antes = best_eval
+        tentados = aceitos = 0
+        for _ in range(iter_max):
+            if tempo_esgotado():
+                break
+            if tempo_limite is not None:
+                t = temperatura_no_tempo()
+
+            # O movimento é aplicado na própria ordem atual e desfeito se o vizinho for rejeitado
+            probabilidades = roleta.probabilidades if roleta is not None else PROBABILIDADES_OPERADORES
+            inicio, operador, movimento = aplicar_movimento(current_order, probabilidades, rng)
+            if tabu is not None and tabu.visitada(current_order):
+                desfazer_movimento(current_order, movimento) # já avaliado há pouco: nem decodifica
+                continue
+            tentados += 1
             
-            delta = nev - current_eval
+            # Sorteia antes o número da aceitação: "delta > 0 ou r < exp(delta/t)"
+            # é o mesmo que "nev > current_eval + t*ln(r)", o score mínimo que o
+            # vizinho precisa passar. Com ele o decodificador pode parar no meio
+            r_aceite = rng.random()
+            limiar = current_eval + t * math.log(r_aceite) if r_aceite > 0 else float('-inf')
+
+            # Avalia o novo vizinho (as posições antes de 'inicio' não mudaram)
+            inicio_decod = time.perf_counter()
+            nev, narea, nval, nrastro = avaliar(current_order, current_rastro, inicio, limiar)
+            duracao = time.perf_counter() - inicio_decod
+
+            melhora = nev - current_eval if nev > current_eval else 0.0
+            if roleta is not None:
+                roleta.registrar(operador, melhora, duracao)
+            estat = uso[OPERADORES[operador]]
+            estat['chamadas'] += 1
+            estat['tempo'] += duracao
+            estat['melhorias'] += melhora > 0
             
             # Critério de aceitação do Recozimento Simulado
-            if delta > 0 or (t > 0 and random.random() < math.exp(delta / t)):
-                current_order = neighbor
-                current_eval = nev
+            if nev > limiar:
+                current_eval, cur_area, cur_val = nev, narea, nval
+                current_rastro = rastro_aceito(current_order, nrastro)
+                aceitos += 1
+                estat['aceitos'] += 1
                 
                 if current_eval > best_eval:
                     best_eval = nev
-                    best_order = list(neighbor)
+                    best_order = list(current_order) # única cópia: só quando o melhor muda
                     best_area = narea # <--- Atualiza com a área da melhor solução
                     best_val = nval   # <--- Atualiza com o valor da melhor solução
+            else:
+                desfazer_movimento(current_order, movimento)
+        avaliacoes_nivel = tentados
         
-        # --- NOVA TROCA (Refinamento de Busca Local) ---
-        # Tenta uma última série de trocas gulosas antes de baixar a temperatura
-        for _ in range(20): # Um número menor de iterações para não pesar
-            idx1, idx2 = random.sample(range(len(current_order)), 2)
-            refinement = list(current_order)
-            refinement[idx1], refinement[idx2] = refinement[idx2], refinement[idx1]
-            
-            rev, _, rarea, rval = bottom_left_placement(refinement, instance.W, instance.H)
-            
-            # Aceitação Determinística: só aceita se for melhor
-            if rev > current_eval:
-                current_order = refinement
-                current_eval = rev
-                if current_eval > best_eval:
-                    best_eval, best_order = current_eval, list(refinement)
-                    best_area, best_val = rarea, rval
+        # --- Busca Local (primeira melhora, ver BuscaLocal) ---
+        if busca_local_a_cada is not None and step % busca_local_a_cada == 0 and not tempo_esgotado():
+            inicio_busca = time.perf_counter()
+            score_antes = current_eval
+            current_eval, cur_area, cur_val, current_rastro, n_aval, n_melh = busca.executar(
+                current_order, current_eval, cur_area, cur_val, current_rastro, avaliacoes_busca_local)
+            etapa = etapas_busca['niveis']
+            etapa['chamadas'] += 1
+            etapa['avaliacoes'] += n_aval
+            etapa['melhorias'] += n_melh
+            etapa['melhora'] += current_eval - score_antes
+            etapa['tempo'] += time.perf_counter() - inicio_busca
+            avaliacoes_nivel += n_aval
+            if current_eval > best_eval:
+                best_eval, best_order = current_eval, list(current_order)
+                best_area, best_val = cur_area, cur_val
         # -----------------------------------------------
         
-        if step % 5 == 0: # Printa a cada 5 reduções de temperatura
-            print(f"    Passo {step} | Temp: {t:.2f} | Melhor Área: {best_eval}")
+        taxa_aceitacao = aceitos / tentados if tentados else 0.0
+        if progresso is not None and step % progresso_a_cada == 0: # a cada 'progresso_a_cada' reduções de temperatura
+            duracao_nivel = time.perf_counter() - inicio_nivel
+            progresso({'tipo': 'nivel', 'origem': 'RS', 'passo': step, 'temperatura': t,
+                       'atual': current_eval, 'melhor': best_eval, 'aceitacao': taxa_aceitacao,
+                       'avaliacoes_por_s': avaliacoes_nivel / duracao_nivel if duracao_nivel > 0 else 0.0})
         
-        t *= alpha
+        if historico is not None:
+            historico.append((step, t, taxa_aceitacao, best_eval))
+        niveis_sem_melhora = 0 if best_eval > melhor_antes else niveis_sem_melhora + 1
+
+        if tempo_limite is not None:
+            t = temperatura_no_tempo()
+        elif resfriamento_adaptativo:
+            if faixa_aceitacao[0] <= taxa_aceitacao <= faixa_aceitacao[1]:
+                t *= alpha
+            else:
+                t *= alpha ** 3
+            if (reaquecer_apos is not None and niveis_sem_melhora >= reaquecer_apos
+                    and reaquecimentos < MAX_REAQUECIMENTOS and t > t_final):
+                t = min(t0, t / alpha ** 20)
+                reaquecimentos += 1
+                niveis_sem_melhora = 0
+                _avisar(progresso, "RS", f"Passo {step} | Reaquecendo para {t:.2f}")
+        else:
+            t *= alpha
         step += 1
+
+        if tempo_esgotado():
+            motivo_parada = "tempo esgotado"
+            break
+        if parar_sem_melhora is not None and niveis_sem_melhora >= parar_sem_melhora:
+            motivo_parada = "sem melhora"
+            break
+        if parar_completo and (best_area == area_pecas or best_area == instance.W * instance.H):
+            motivo_parada = "completo"
+            break
+        if cota_superior is not None and best_val >= cota_superior:
+            motivo_parada = "cota atingida"
+            break
+
+        # Grava no fim do nível, quando o estado está completo; o arquivo fica
+        # até quem chamou apagar (processar_instancia apaga ao salvar a linha)
+        if checkpoint is not None and time.perf_counter() - ultimo_checkpoint >= intervalo_checkpoint:
+            salvar_checkpoint(checkpoint, {
+                'ordem_atual': [item.id for item in current_order],
+                'melhor_ordem': [item.id for item in best_order],
+                'melhor': (best_eval, best_area, best_val),
+                't0': t0, 't_final': t_final, 't': t, 'passo': step,
+                'niveis_sem_melhora': niveis_sem_melhora, 'reaquecimentos': reaquecimentos,
+                'uso': uso,
+                'roleta': (roleta.probabilidades, roleta.notas) if roleta is not None else None,
+                'historico': list(historico) if historico is not None else None,
+                'busca_local': (busca.nao_olhar, busca.cursor, etapas_busca['niveis']),
+                'tabu': (list(tabu.chaves), tabu.consultas, tabu.acertos) if tabu is not None else None,
+                'decorrido': time.perf_counter() - inicio_rs,
+                'aleatorio': rng.getstate(),
+            })
+            ultimo_checkpoint = time.perf_counter()
+
+    # Busca local final no melhor, até o ótimo local ou avaliacoes_busca_final
+    # (não roda se o orçamento de tempo já acabou)
+    if busca_local_final and not tempo_esgotado():
+        inicio_busca = time.perf_counter()
+        score_antes = best_eval
+        busca.nao_olhar, busca.cursor = {}, 0
+        best_order = list(best_order)
+        best_eval, best_area, best_val, _, n_aval, n_melh = busca.executar(
+            best_order, best_eval, best_area, best_val, rastro_aceito(best_order, None), avaliacoes_busca_final)
+        etapa = etapas_busca['final']
+        etapa['chamadas'] += 1
+        etapa['avaliacoes'] += n_aval
+        etapa['melhorias'] += n_melh
+        etapa['melhora'] += best_eval - score_antes
+        etapa['tempo'] += time.perf_counter() - inicio_busca
+
+    _avisar(progresso, "RS", f"Parada: {motivo_parada} (passo {step})")
+    if cache is not None:
+        _avisar(progresso, "RS", f"Cache: {cache.acertos} acertos, {cache.faltas} faltas, {cache.descartes} descartes")
+    for nome, estat in uso.items():
+        _avisar(progresso, "RS", f"{nome}: {estat['chamadas']} chamadas, {estat['aceitos']} aceitos, "
+                                 f"{estat['melhorias']} melhorias, {estat['tempo']:.2f}s")
+    if tabu is not None:
+        _avisar(progresso, "RS", f"Memória tabu: {len(tabu.chaves)}/{tabu.tamanho} permutações, "
+                                 f"{tabu.acertos} de {tabu.consultas} vizinhos pulados sem decodificar")
+    for nome, etapa in etapas_busca.items():
+        _avisar(progresso, "RS", f"Busca local ({nome}): {etapa['chamadas']} chamadas, {etapa['avaliacoes']} avaliações, "
+                                 f"{etapa['melhorias']} melhorias, +{etapa['melhora']:.4f} no score, {etapa['tempo']:.2f}s")
+    if relatorio is not None:
+        relatorio['operadores'] = uso
+        relatorio['motivo_parada'] = motivo_parada
+        relatorio['busca_local'] = etapas_busca
+        if tabu is not None:
+            relatorio['tabu'] = {'tamanho': tabu.tamanho, 'ocupadas': len(tabu.chaves),
+                                 'consultas': tabu.consultas, 'acertos': tabu.acertos}
+        relatorio['probabilidades'] = dict(zip(OPERADORES, roleta.probabilidades if roleta is not None else PROBABILIDADES_OPERADORES))
         
     return best_eval, best_order, best_area, best_val
 
+# --- Multi-start Paralelo ---
+# Roda várias cadeias de RS independentes, com sementes diferentes, em
+# processos separados (uma por núcleo) e fica com a melhor. A instância vai
+# para cada processo uma vez só, no initializer do pool; cada tarefa recebe
+# só a semente e os parâmetros do RS, e devolve a ordem como lista de ids.
+# A semente de cada cadeia sai de derivar_semente(semente_base, "cadeia<c>").
+_instancia_worker = None
+
+def _iniciar_worker(instance):
+    global _instancia_worker
+    _instancia_worker = instance
+
+@contextmanager
+def _pool_da_instancia(instance, n_processos):
+    # Como o 'with ProcessPoolExecutor(...)', mas se o bloco for interrompido
+    # (ex: TempoEsgotado do lote) sai na hora em vez de esperar todas as
+    # tarefas terminarem. O shutdown só cancela as que ainda não começaram,
+    # então os processos são encerrados, para nenhuma cadeia continuar
+    # rodando (e disputando a CPU com as próximas instâncias do lote)
+    pool = ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_worker, initargs=(instance,))
+    try:
+        yield pool
+    except BaseException:
+        processos = list((pool._processes or {}).values())
+        for processo in processos:
+            processo.terminate()
+        for processo in processos:
+            processo.join()
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+
+def _cadeia_rs(semente, parametros):
+    inicio = time.time()
+    # As cadeias não mandam progresso (progresso=None)
+    best_eval, best_order, best_area, best_val = recozimento_simulado(_instancia_worker, semente=semente, progresso=None, **parametros)
+    return semente, best_eval, [item.id for item in best_order], best_area, best_val, time.time() - inicio
+
+def rs_multi_inicio(instance, n_cadeias=None, n_processos=None, semente_base=None, **parametros):
+    # 'parametros' vão direto para o recozimento_simulado de cada cadeia
+    n_processos = n_processos or os.cpu_count() or 1
+    n_cadeias = n_cadeias or n_processos
+    if semente_base is None:
+        semente_base = random.randrange(2**31)
+    sementes = [derivar_semente(semente_base, f"cadeia{c}") for c in range(n_cadeias)]
+    # tempo_limite vale para o multi-start inteiro: com mais cadeias que
+    # processos elas rodam em levas, e cada leva fica com uma parte do tempo
+    if parametros.get('tempo_limite') is not None:
+        parametros = dict(parametros, tempo_limite=parametros['tempo_limite'] / math.ceil(n_cadeias / n_processos))
+
+    with _pool_da_instancia(instance, n_processos) as pool:
+        resultados = list(pool.map(_cadeia_rs, sementes, [parametros] * n_cadeias))
+
+    # Estatística de cada cadeia e a melhor de todas
+    cadeias = [
+        {'semente': semente, 'score': score, 'area': area, 'valor': valor, 'tempo': tempo}
+        for semente, score, _, area, valor, tempo in resultados
+    ]
+    _, best_eval, ids, best_area, best_val, _ = max(resultados, key=lambda r: r[1])
+    por_id = {item.id: item for item in instance.items}
+    best_order = [por_id[i] for i in ids]
+    return best_eval, best_order, best_area, best_val, cadeias
+
+# --- Têmpera Paralela (Parallel Tempering) ---
+# Em vez de um resfriamento só, K réplicas rodam o mesmo RS a temperaturas
+# fixas (escala geométrica de t_max até t_min), cada uma num processo. A cada
+# rodada as réplicas voltam com a ordem atual e o processo principal tenta
+# trocar as ordens entre temperaturas vizinhas pelo critério de Metropolis:
+# a ordem boa desce para o frio e a fria ruim sobe para ser embaralhada.
+def _rodada_replica(ids, t, iteracoes, semente, parametros, prazo=None):
+    # 'prazo' é o horário (time.time()) em que a têmpera tem que parar; a
+    # réplica confere antes de cada decodificação e devolve o que tiver
+    rng = random.Random(semente)
+    instance = _instancia_worker
+    avaliar, rastro_aceito, _ = criar_avaliador(instance, **parametros)
+    por_id = {item.id: item for item in instance.items}
+
+    current_order = [por_id[i] for i in ids]
+    current_eval, cur_area, cur_val, current_rastro = avaliar(current_order)
+    best_eval, best_order, best_area, best_val = current_eval, current_order, cur_area, cur_val
+    aceitos = 0
+
+    for _ in range(iteracoes):
+        if prazo is not None and time.time() >= prazo:
+            break
+        neighbor, inicio, _ = gerar_vizinho(current_order, rng=rng)
+        r_aceite = rng.random()
+        limiar = current_eval + t * math.log(r_aceite) if r_aceite > 0 else float('-inf')
+        nev, narea, nval, nrastro = avaliar(neighbor, current_rastro, inicio, limiar)
+
+        if nev > limiar:
+            current_order = neighbor
+            current_eval = nev
+            current_rastro = rastro_aceito(neighbor, nrastro)
+            aceitos += 1
+            if current_eval > best_eval:
+                best_eval, best_order, best_area, best_val = nev, neighbor, narea, nval
+
+    return ([item.id for item in current_order], current_eval,
+            [item.id for item in best_order], best_eval, best_area, best_val, aceitos)
+
+def tempera_paralela(instance, n_replicas=None, t_min=1.0, t_max=1000, rodadas=50, iter_rodada=300,
+                     n_processos=None, semente_base=None, tempo_limite=None, progresso=progresso_console, **parametros):
+    # 'parametros' vão para o criar_avaliador (decoder, usar_grade, tamanho_cache...)
+    # Com tempo_limite (segundos), as réplicas recebem o prazo e param no meio
+    # da rodada quando ele passa; a têmpera termina nessa rodada
+    prazo = time.time() + tempo_limite if tempo_limite is not None else None
+    n_processos = n_processos or os.cpu_count() or 1
+    n_replicas = n_replicas or max(n_processos, 4)
+    if semente_base is None:
+        semente_base = random.randrange(2**31)
+    rng = random.Random(semente_base) # sorteios das trocas, separados das réplicas
+
+    # Temperaturas da mais quente (índice 0) para a mais fria
+    temperaturas = [t_max * (t_min / t_max) ** (k / max(n_replicas - 1, 1)) for k in range(n_replicas)]
+
+    # Todas começam da ordem inicial do RS (maior área primeiro)
+    inicial = sorted(instance.items, key=lambda x: x.area, reverse=True)
+    ids = [[item.id for item in inicial] for _ in range(n_replicas)]
+    scores = [None] * n_replicas
+
+    best_eval, best_ids, best_area, best_val = float('-inf'), None, 0, 0
+    tentativas = [0] * (n_replicas - 1) # trocas tentadas entre as temperaturas k e k+1
+    trocas = [0] * (n_replicas - 1)
+    aceitos = [0] * n_replicas
+
+    _avisar(progresso, "PT", f"{n_replicas} réplicas de {temperaturas[0]:.1f} a {temperaturas[-1]:.1f}")
+    with _pool_da_instancia(instance, n_processos) as pool:
+        for rodada in range(rodadas):
+            sementes = [derivar_semente(semente_base, f"rodada{rodada}/replica{k}") for k in range(n_replicas)]
+            resultados = pool.map(_rodada_replica, ids, temperaturas, [iter_rodada] * n_replicas,
+                                  sementes, [parametros] * n_replicas, [prazo] * n_replicas)
+
+            for k, (atual_ids, atual, melhor_ids, melhor, area, valor, n_aceitos) in enumerate(resultados):
+                ids[k], scores[k] = atual_ids, atual
+                aceitos[k] += n_aceitos
+                if melhor > best_eval:
+                    best_eval, best_ids, best_area, best_val = melhor, melhor_ids, area, valor
+
+            # Trocas de Metropolis entre vizinhas, alternando os pares (0-1, 2-3...) e (1-2, 3-4...)
+            for k in range(rodada % 2, n_replicas - 1, 2):
+                tentativas[k] += 1
+                delta = (scores[k + 1] - scores[k]) * (1 / temperaturas[k + 1] - 1 / temperaturas[k])
+                if delta <= 0 or rng.random() < math.exp(-delta):
+                    ids[k], ids[k + 1] = ids[k + 1], ids[k]
+                    scores[k], scores[k + 1] = scores[k + 1], scores[k]
+                    trocas[k] += 1
+
+            if rodada % 10 == 0:
+                _avisar(progresso, "PT", f"Rodada {rodada} | Melhor: {best_eval}")
+            if prazo is not None and time.time() >= prazo:
+                break
+
+    estatisticas = {
+        'temperaturas': temperaturas,
+        'aceitos': aceitos, # vizinhos aceitos por réplica
+        'trocas': [f"{a}/{b}" for a, b in zip(trocas, tentativas)], # aceitas/tentadas por par
+    }
+    por_id = {item.id: item for item in instance.items}
+    best_order = [por_id[i] for i in best_ids]
+    return best_eval, best_order, best_area, best_val, estatisticas
+
+# --- BRKGA (Algoritmo Genético de Chaves Aleatórias Viciadas) ---
+# Alternativa populacional ao RS. Cada cromossomo é um vetor de chaves em
+# [0, 1), uma por item de instance.items; ordenar os itens pelas chaves dá a
+# permutação que vai para o decodificador (BL/HZZ/...). A cada geração a
+# elite passa direto, entram alguns mutantes (chaves novas) e o resto é
+# cruzamento de um pai da elite com um de fora dela, puxando cada chave do
+# pai da elite com probabilidade 'heranca'. Os cromossomos novos de uma
+# geração são divididos em lotes, um por processo, e avaliados no pool (a
+# instância vai uma vez só para cada processo, como no multi-start).
+# Com prazo, cada lote para de decodificar quando ele passa e devolve só os
+# que avaliou; a geração fica com esses e o BRKGA termina nela.
+def _ordem_das_chaves(instance, chaves):
+    return [instance.items[k] for k in sorted(range(len(chaves)), key=chaves.__getitem__)]
+
+def _avaliar_cromossomos(lote, parametros, prazo=None):
+    # 'prazo' é o horário (time.time()) de parar; o primeiro do lote sempre é
+    # avaliado, para a população inicial nunca sair vazia
+    instance = _instancia_worker
+    avaliar, _, _ = criar_avaliador(instance, **parametros)
+    resultados = []
+    for chaves in lote:
+        if resultados and prazo is not None and time.time() >= prazo:
+            break
+        score, area, valor, _ = avaliar(_ordem_das_chaves(instance, chaves))
+        resultados.append((score, area, valor))
+    return resultados
+
+def brkga(instance, populacao=100, elite=0.2, mutantes=0.15, heranca=0.7, geracoes=200,
+          n_processos=None, semente_base=None, tempo_limite=None, progresso=progresso_console, **parametros):
+    # 'parametros' vão para o criar_avaliador (decoder, usar_grade, tamanho_cache...)
+    # Com tempo_limite (segundos), os lotes recebem o prazo e param no meio da
+    # geração quando ele passa; o resultado é o melhor avaliado até ali
+    prazo = time.time() + tempo_limite if tempo_limite is not None else None
+    n_processos = n_processos or os.cpu_count() or 1
+    if semente_base is None:
+        semente_base = random.randrange(2**31)
+    rng = random.Random(semente_base)
+    n = len(instance.items)
+    n_elite = max(1, int(populacao * elite))
+    n_mutantes = max(1, int(populacao * mutantes))
+    n_filhos = max(0, populacao - n_elite - n_mutantes)
+
+    def avaliar_em_lotes(pool, cromossomos):
+        # Pares (aptidão, chaves) só dos cromossomos que os lotes chegaram a avaliar
+        tamanho = math.ceil(len(cromossomos) / n_processos)
+        lotes = [cromossomos[k:k + tamanho] for k in range(0, len(cromossomos), tamanho)]
+        aptidoes = pool.map(_avaliar_cromossomos, lotes, [parametros] * len(lotes), [prazo] * len(lotes))
+        return [par for lote, resultados in zip(lotes, aptidoes) for par in zip(resultados, lote)]
+
+    # Um cromossomo com a ordem inicial do RS (maior área primeiro); o resto é aleatório
+    inicial = [0.0] * n
+    for posicao, k in enumerate(sorted(range(n), key=lambda k: instance.items[k].area, reverse=True)):
+        inicial[k] = posicao / n
+    cromossomos = [inicial] + [[rng.random() for _ in range(n)] for _ in range(populacao - 1)]
+
+    motivo_parada = "gerações"
+    geracao = 0
+    _avisar(progresso, "GA", f"População {populacao} ({n_elite} elite, {n_mutantes} mutantes) por {geracoes} gerações")
+    with _pool_da_instancia(instance, n_processos) as pool:
+        # Pares (score, área, valor) e chaves, do melhor para o pior
+        individuos = sorted(avaliar_em_lotes(pool, cromossomos), key=lambda ind: ind[0][0], reverse=True)
+        avaliacoes = len(individuos)
+
+        while geracao < geracoes:
+            if prazo is not None and time.time() >= prazo:
+                motivo_parada = "tempo esgotado"
+                break
+            elites = individuos[:n_elite]
+            outros = individuos[n_elite:] or elites
+            novos = [[rng.random() for _ in range(n)] for _ in range(n_mutantes)]
+            for _ in range(n_filhos):
+                pai_elite = rng.choice(elites)[1]
+                pai = rng.choice(outros)[1]
+                novos.append([a if rng.random() < heranca else b for a, b in zip(pai_elite, pai)])
+
+            # Cortada pelo prazo, a geração fica com menos indivíduos; o laço
+            # termina logo em seguida, então isso não chega a outra geração
+            avaliados = avaliar_em_lotes(pool, novos)
+            individuos = sorted(elites + avaliados, key=lambda ind: ind[0][0], reverse=True)
+            avaliacoes += len(avaliados)
+            geracao += 1
+
+            if geracao % 10 == 0:
+                _avisar(progresso, "GA", f"Geração {geracao} | Melhor: {individuos[0][0][0]}")
+
+    (best_eval, best_area, best_val), chaves = individuos[0]
+    estatisticas = {'geracoes': geracao, 'avaliacoes': avaliacoes, 'motivo_parada': motivo_parada}
+    return best_eval, _ordem_das_chaves(instance, chaves), best_area, best_val, estatisticas
+
 # --- Leitura ---
 def load_instance(filepath):
     with open(filepath, 'r') as f:
@@ -225,7 +1518,9 @@ def load_instance(filepath):
 
         for i in range(2, 2 + num_items):
             parts = list(map(int, lines[i].split()))
-            w, h, v = parts[0], parts[1], parts[2]
+            # Instâncias sem coluna de valor (ex: lu*, uu*) contam como valor 0
+            w, h = parts[0], parts[1]
+            v = parts[2] if len(parts) > 2 else 0
             
             if v > 0: tem_valor_real = True # Se houver qualquer valor > 0, muda o modo
             items.append(Item(i-2, w, h, v))
@@ -233,24 +1528,264 @@ def load_instance(filepath):
     modo = "Valor" if tem_valor_real else "Área" # Define o rótulo baseado na detecção
     return Instance(os.path.basename(filepath), cont_w, cont_h, items, modo)
 
+# --- Execução em Lote ---
+# Cada instância do main() roda inteira (otimização, decodificação final e
+# imagem) em processar_instancia, que devolve os campos da linha da tabela.
+# Com n_processos > 1 as instâncias vão para um pool de processos e chegam
+# fora de ordem; a tabela só é escrita no fim, ordenada pelo nome.
+# O limite de tempo por instância usa signal.alarm, que só existe no
+# Linux/macOS; no Windows as instâncias rodam sem limite. Multi-start, têmpera
+# paralela e BRKGA rodam as cadeias em outros processos, que o alarme não
+# interrompe: para elas o limite também vira tempo_limite (com uma folga
+# para a decodificação final e a imagem), e elas param sozinhas a tempo.
+# Se mesmo assim o alarme disparar, _pool_da_instancia encerra os processos.
+# Com config['pasta_checkpoints'], cada instância terminada deixa a sua linha
+# salva lá ("<arquivo>.fim") e o RS de uma cadeia grava o seu checkpoint
+# ("<arquivo>.pkl"); rodando o lote de novo na mesma pasta, as terminadas são
+# puladas e a interrompida continua do checkpoint. Multi-start e têmpera
+# paralela não têm checkpoint: se forem interrompidas, recomeçam.
+class TempoEsgotado(Exception):
+    pass
+
+FOLGA_LIMITE = 0.9 # fração do limite da instância dada às meta-heurísticas com pool
+RESERVA_LIMITE = 1.0 # segundos do limite guardados para a decodificação final e a imagem
+
+def _estourou_tempo(signum, frame):
+    raise TempoEsgotado()
+
+def _semente_instancia(config, caminho):
+    # Depende só da semente mestre e do arquivo, não da ordem em que o lote roda
+    return derivar_semente(config['semente'], os.path.basename(caminho))
+
+def _linha_sem_resultado(caminho, motivo, duracao, semente='-'):
+    return {'nome': os.path.basename(caminho), 'modo': '-', 'dimensoes': '-', 'itens': '-',
+            'valor': motivo, 'ocupacao': '-', 'tempo': duracao, 'parada': '-', 'semente': semente}
+
+def _arquivo_concluida(pasta_checkpoints, caminho):
+    return os.path.join(pasta_checkpoints, os.path.basename(caminho) + ".fim")
+
+def processar_instancia(caminho, pasta_imagens, config):
+    filename = os.path.basename(caminho)
+    progresso = config['progresso']
+    if progresso is not None:
+        progresso({'tipo': 'instancia', 'nome': filename})
+    start_time = time.time()
+    
+    decodificador = config['decodificador']
+    parametros = {'decoder': decodificador, 'usar_grade': config['usar_grade'], 'tamanho_cache': config['tamanho_cache'],
+                  'tempo_limite': config['tempo_limite']}
+    # Opções que só o RS entende (a têmpera paralela tem temperaturas fixas)
+    opcoes_rs = {'resfriamento_adaptativo': config['resfriamento_adaptativo'], 'calibrar_t0': config['calibrar_t0'],
+                 'roleta_adaptativa': config['roleta_adaptativa'], 'parar_sem_melhora': config['parar_sem_melhora'],
+                 'parar_completo': config['parar_completo'], 'memoria_tabu': config['memoria_tabu']}
+    relatorio = {}
+    # Semente da instância: com ela (e a mesma config) o RS da linha pode ser
+    # rodado de novo sozinho, sem refazer o lote
+    semente = _semente_instancia(config, caminho)
+    checkpoint = None
+    if config['pasta_checkpoints'] is not None:
+        checkpoint = os.path.join(config['pasta_checkpoints'], f"{filename}.pkl")
+
+    inst = load_instance(caminho)
+    if config['populacao_brkga'] > 0:
+        best_score, best_order, area_final, valor_final, estatisticas = brkga(
+            inst, config['populacao_brkga'], semente_base=semente, progresso=progresso, **parametros)
+        relatorio['motivo_parada'] = estatisticas['motivo_parada']
+        _avisar(progresso, "GA", f"{estatisticas['geracoes']} gerações, {estatisticas['avaliacoes']} avaliações")
+    elif config['n_replicas'] > 0:
+        best_score, best_order, area_final, valor_final, estatisticas = tempera_paralela(
+            inst, config['n_replicas'], semente_base=semente, progresso=progresso, **parametros)
+        _avisar(progresso, "PT", f"Trocas aceitas/tentadas por par de temperaturas: {estatisticas['trocas']}")
+    elif config['n_cadeias'] > 1:
+        best_score, best_order, area_final, valor_final, cadeias = rs_multi_inicio(
+            inst, config['n_cadeias'], semente_base=semente, **opcoes_rs, **parametros)
+        for cadeia in cadeias:
+            _avisar(progresso, "RS", f"Cadeia semente {cadeia['semente']}: score {cadeia['score']:.4f} em {cadeia['tempo']:.2f}s")
+    else:
+        historico = []
+        best_score, best_order, area_final, valor_final = recozimento_simulado(
+            inst, historico=historico, relatorio=relatorio, checkpoint=checkpoint,
+            intervalo_checkpoint=config['intervalo_checkpoint'], semente=semente, progresso=progresso,
+            **opcoes_rs, **parametros)
+
+        # Histórico de temperaturas, para comparar os esquemas de resfriamento
+        with open(os.path.join(config['pasta_resfriamento'], f"{inst.name}.csv"), 'w') as arq:
+            arq.write("passo;temperatura;aceitacao;melhor\n")
+            for passo, temperatura, taxa, melhor in historico:
+                arq.write(f"{passo};{temperatura:.4f};{taxa:.4f};{melhor}\n")
+    
+    # Gera o resultado final com a melhor ordem encontrada
+    # (única decodificação que monta o layout; o RS só usa o score)
+    _, final_placement, area_final, valor_final = decodificador(best_order, inst.W, inst.H)
+    
+    end_time = time.time()
+    duracao = end_time - start_time
+
+    # Cálculo da string de ocupação: ex "145/150 (96.67%)"
+    ocup_str = f"{area_final}/{inst.area_total_container}"
+    ocup_perc = (area_final / inst.area_total_container) * 100
+
+    # --- Verificação/Depuração ---
+    _avisar(progresso, "OK", f"Finalizado. Área: {valor_final} em {duracao:.2f}s")
+    _avisar(progresso, "INFO", "Lista de posições gerada pelo Bottom-Left (Top 5):" + "".join(
+        f"\n    Item {p['id']}: pos({p['x']}, {p['y']}) dim({p['w']}x{p['h']})" for p in final_placement[:5]))
+
+    # Define o caminho do salvamento da imagem
+    caminho_img = os.path.join(pasta_imagens, f"layout_{inst.name}.png")
+    
+    # Gera imagem do resultado
+    plot_solution(inst.W, inst.H, final_placement, inst.name, valor_final, caminho_img)
+    _avisar(progresso, "IMG", f"Gráfico salvo como 'layout_{caminho_img}.png'")
+
+    linha = {
+        'nome': inst.name,
+        'modo': inst.modo_calculo,
+        'dimensoes': f"{inst.W}x{inst.H}",
+        'itens': f"{len(final_placement)}/{len(inst.items)}",
+        'valor': valor_final,
+        'ocupacao': f"{ocup_str} ({ocup_perc:.2f}%)",
+        'tempo': duracao,
+        'operadores': relatorio.get('operadores'), # só no RS de uma cadeia
+        'probabilidades': relatorio.get('probabilidades'),
+        'busca_local': relatorio.get('busca_local'),
+        'parada': relatorio.get('motivo_parada', '-'),
+        'semente': semente,
+    }
+    if checkpoint is not None:
+        salvar_checkpoint(_arquivo_concluida(config['pasta_checkpoints'], caminho), linha)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+    return linha
+
+def _processar_com_limite(caminho, pasta_imagens, config, limite):
+    inicio = time.time()
+    usar_alarme = limite is not None and hasattr(signal, 'SIGALRM')
+    if usar_alarme:
+        signal.signal(signal.SIGALRM, _estourou_tempo)
+        signal.alarm(max(1, math.ceil(limite)))
+    usa_pool = config['n_cadeias'] > 1 or config['n_replicas'] > 0 or config['populacao_brkga'] > 0
+    if limite is not None and usa_pool:
+        orcamento = max(0.0, limite * FOLGA_LIMITE - RESERVA_LIMITE)
+        if config['tempo_limite'] is not None:
+            orcamento = min(orcamento, config['tempo_limite'])
+        config = dict(config, tempo_limite=orcamento)
+    try:
+        return processar_instancia(caminho, pasta_imagens, config)
+    except TempoEsgotado:
+        _avisar(config['progresso'], "LOTE", f"{os.path.basename(caminho)}: tempo esgotado ({limite}s)")
+        return _linha_sem_resultado(caminho, "tempo esgotado", limite, _semente_instancia(config, caminho))
+    except Exception as erro:
+        # Um erro numa instância (ex: arquivo que não é instância) não derruba o lote inteiro
+        _avisar(config['progresso'], "LOTE", f"{os.path.basename(caminho)}: erro {erro!r}")
+        return _linha_sem_resultado(caminho, "erro", time.time() - inicio, _semente_instancia(config, caminho))
+    finally:
+        if usar_alarme:
+            signal.alarm(0)
+
+def executar_lote(caminhos, pasta_imagens, config, n_processos=1, limite=None):
+    # Devolve as linhas de todas as instâncias, ordenadas pelo nome
+    linhas = []
+    if config['pasta_checkpoints'] is not None:
+        pendentes = []
+        for c in caminhos:
+            linha = carregar_checkpoint(_arquivo_concluida(config['pasta_checkpoints'], c))
+            if linha is None:
+                pendentes.append(c)
+            else:
+                _avisar(config['progresso'], "LOTE", f"{os.path.basename(c)}: já concluída, usando o resultado salvo")
+                linhas.append(linha)
+        caminhos = pendentes
+
+    if n_processos <= 1:
+        linhas += [_processar_com_limite(c, pasta_imagens, config, limite) for c in caminhos]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos) as pool:
+            futuros = {pool.submit(_processar_com_limite, c, pasta_imagens, config, limite): c for c in caminhos}
+            for futuro in as_completed(futuros):
+                # Os erros da instância já voltam como linha; aqui só os do próprio pool
+                try:
+                    linhas.append(futuro.result())
+                except Exception as erro:
+                    _avisar(config['progresso'], "LOTE", f"{os.path.basename(futuros[futuro])}: erro {erro!r}")
+                    linhas.append(_linha_sem_resultado(futuros[futuro], "erro", 0, _semente_instancia(config, futuros[futuro])))
+    return sorted(linhas, key=lambda linha: linha['nome'])
+
 # --- Execução Principal ---
 def main():
     # 1. Defina um identificador para essa rodada (ex: 'teste_T1000_A90')
     identificador_teste = "RS(HC)+BL+Rotacao-comparacao_geral"
 
-    # 2. Cria a pasta com o identificador + data/hora
-    pasta_teste = preparar_pasta(identificador_teste)
+    # 2. Cria a pasta com o identificador + data/hora. Para retomar uma rodada
+    #    interrompida, coloque aqui a pasta dela: as instâncias já concluídas
+    #    são puladas e a que parou no meio continua do último checkpoint
+    retomar_pasta = None # ex: 'results/RS(HC)+BL+Rotacao-comparacao_geral_20260420_101500'
+    pasta_teste = retomar_pasta or preparar_pasta(identificador_teste)
 
     # 3. Defina o caminho onde estão as instancias
     folder_path = './data/ins teste 4.0' 
     results_file = os.path.join(pasta_teste, 'resultsBlRot.txt')
 
+    # 4. Escolha o motor de posicionamento: bottom_left_placement, skyline_placement
+    #    ou maximal_rectangles_placement
+    decodificador = bottom_left_placement
+    usar_grade = False # grade espacial no teste de sobreposição (mesmo resultado, só muda o tempo)
+    tamanho_cache = 10000 # nº de permutações guardadas no cache de avaliações (0 desliga)
+    n_cadeias = 1 # > 1 roda essa quantidade de RS independentes em paralelo e fica com o melhor
+    n_replicas = 0 # > 0 troca o RS pela têmpera paralela com essa quantidade de réplicas
+    populacao_brkga = 0 # > 0 troca o RS pelo BRKGA com essa população (avaliada em lotes no pool de processos)
+    tempo_por_instancia = None # orçamento de tempo (s) da otimização; None = resfriamento por alpha
+    resfriamento_adaptativo = False # acelera os níveis com aceitação fora da faixa alvo (ver recozimento_simulado)
+    calibrar_t0 = False # ajusta t0 à escala do objetivo de cada instância (aceitação inicial de 80%)
+    roleta_adaptativa = False # probabilidades dos operadores se ajustam à melhora por tempo de cada um
+    parar_sem_melhora = None # encerra o RS após essa quantidade de níveis sem melhora (None = nunca)
+    parar_completo = False # encerra o RS quando todas as peças couberem ou o contêiner encher
+    semente = None # semente mestre do lote (None = sorteia uma; fica gravada no resultado)
+    memoria_tabu = 0 # nº de permutações recentes que o RS não decodifica de novo (0 desliga)
+    gravar_progresso = True # além do console, grava os eventos de progresso em progresso.jsonl na pasta da rodada
+    intervalo_checkpoint = 60 # segundos entre as gravações do estado do RS (None desliga o checkpoint e a retomada)
+
+    # 5. Execução em lote: nº de instâncias rodando ao mesmo tempo (1 = uma por vez)
+    #    e limite de tempo por instância em segundos (None = sem limite)
+    n_processos = 1
+    limite_instancia = None
+
     # Define e cria subpasta de imagens
     pasta_imagens = os.path.join(pasta_teste, 'imagens')
     os.makedirs(pasta_imagens, exist_ok=True)
+
+    # Subpasta com o histórico de temperaturas do RS de cada instância
+    pasta_resfriamento = os.path.join(pasta_teste, 'resfriamento')
+    os.makedirs(pasta_resfriamento, exist_ok=True)
+
+    progresso = progresso_console
+    if gravar_progresso:
+        progresso = ProgressoCombinado(progresso_console, ProgressoArquivo(os.path.join(pasta_teste, 'progresso.jsonl')))
+
+    # A semente mestre fica gravada na pasta da rodada. Numa rodada retomada
+    # vale a gravada, para a semente das linhas novas ser a mesma que gerou
+    # os checkpoints (senão a linha apontaria para uma semente nunca usada)
+    arquivo_semente = os.path.join(pasta_teste, 'semente.txt')
+    if os.path.exists(arquivo_semente):
+        with open(arquivo_semente) as arq:
+            semente_gravada = int(arq.read())
+        if semente is not None and semente != semente_gravada:
+            _avisar(progresso, "LOTE", f"Aviso: rodada retomada, usando a semente gravada {semente_gravada} em vez de {semente}")
+        semente = semente_gravada
+    else:
+        if semente is None:
+            semente = random.randrange(2**31)
+        with open(arquivo_semente, 'w') as arq:
+            arq.write(f"{semente}\n")
+    _avisar(progresso, "LOTE", f"Semente mestre: {semente}")
+
+    # Subpasta com os checkpoints do RS e as linhas das instâncias já concluídas
+    pasta_checkpoints = None
+    if intervalo_checkpoint is not None:
+        pasta_checkpoints = os.path.join(pasta_teste, 'checkpoints')
+        os.makedirs(pasta_checkpoints, exist_ok=True)
     
     if not os.path.exists(folder_path):
-        print(f"Erro: Pasta {folder_path} não encontrada.")
+        _avisar(progresso, "LOTE", f"Erro: Pasta {folder_path} não encontrada.")
         return
     
     # Definindo largura de cada coluna (ajustar caso necessario)
@@ -261,6 +1796,8 @@ def main():
     w_obj = 15
     w_ocup = 19
     w_tempo = 10
+    w_parada = 17
+    w_semente = 19
 
     with open(results_file, 'w') as out:
         # Cabeçalho do resultado
@@ -271,7 +1808,9 @@ def main():
             f"{'Itens (E/T)':<{w_itens}} | "
             f"{'Valor Obj.':<{w_obj}} | "
             f"{'Ocupação':<{w_ocup}} | "
-            f"{'Tempo (s)':<{w_tempo}}\n"
+            f"{'Tempo (s)':<{w_tempo}} | "
+            f"{'Parada':<{w_parada}} | "
+            f"{'Semente':<{w_semente}}\n"
         )
 
         separador = "-" * len(header) + "\n"
@@ -279,58 +1818,78 @@ def main():
         out.write(header)
         out.write(separador)
         
-        for filename in os.listdir(folder_path):
-            if filename.endswith(".txt"):
-                print(f"\n>>> Processando: {filename}")
-                start_time = time.time()
-                
-                inst = load_instance(os.path.join(folder_path, filename))
-                best_score, best_order, area_final, valor_final = recozimento_simulado(inst)
-                
-                # Gera o resultado final com a melhor ordem encontrada
-                _, final_placement, area_final, valor_final = bottom_left_placement(best_order, inst.W, inst.H)
+        config = {
+            'decodificador': decodificador,
+            'usar_grade': usar_grade,
+            'tamanho_cache': tamanho_cache,
+            'n_cadeias': n_cadeias,
+            'n_replicas': n_replicas,
+            'populacao_brkga': populacao_brkga,
+            'tempo_limite': tempo_por_instancia,
+            'resfriamento_adaptativo': resfriamento_adaptativo,
+            'calibrar_t0': calibrar_t0,
+            'roleta_adaptativa': roleta_adaptativa,
+            'parar_sem_melhora': parar_sem_melhora,
+            'parar_completo': parar_completo,
+            'memoria_tabu': memoria_tabu,
+            'pasta_resfriamento': pasta_resfriamento,
+            'pasta_checkpoints': pasta_checkpoints,
+            'intervalo_checkpoint': intervalo_checkpoint,
+            'semente': semente,
+            'progresso': progresso,
+        }
+        caminhos = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if f.endswith(".txt")]
+        linhas = executar_lote(caminhos, pasta_imagens, config, n_processos, limite_instancia)
 
-                # Calcula a quantidade de itens empacotados
-                qtd_empacotados = len(final_placement)
-                qtd_total = len(inst.items)
-                
-                end_time = time.time()
-                duracao = end_time - start_time
-
-                # Preparando strings complexas
-                dimensoes = f"{inst.W}x{inst.H}"
-                status_itens = f"{len(final_placement)}/{len(inst.items)}"
-
-                # Cálculo da string de ocupação: ex "145/150 (96.67%)"
-                ocup_str = f"{area_final}/{inst.area_total_container}"
-                ocup_perc = (area_final / inst.area_total_container) * 100
-                ocup_full = f"{ocup_str} ({ocup_perc:.2f}%)"
-
-                # --- Verificação/Depuração ---
-                print(f"  [OK] Finalizado. Área: {valor_final} em {duracao:.2f}s")
-                print(f"  [INFO] Lista de posições gerada pelo Bottom-Left (Top 5):")
-                for p in final_placement[:5]:
-                    print(f"    Item {p['id']}: pos({p['x']}, {p['y']}) dim({p['w']}x{p['h']})")
-
-                # Define o caminho do salvamento da imagem
-                caminho_img = os.path.join(pasta_imagens, f"layout_{inst.name}.png")
-                
-                # Gera imagem do resultado
-                plot_solution(inst.W, inst.H, final_placement, inst.name, valor_final, caminho_img)
-                print(f"  [IMG] Gráfico salvo como 'layout_{caminho_img}.png'")
-
-                # Printa o resultado de cada instancia
-                linha = (
-                f"{inst.name:<{w_nome}} | "
-                f"{inst.modo_calculo:<{w_modo}} | "
-                f"{dimensoes:<{w_dim}} | "
-                f"{status_itens:<{w_itens}} | "
-                f"{valor_final:<{w_obj}} | "
-                f"{ocup_full:<{w_ocup}} | "
-                f"{duracao:<{w_tempo}}\n" 
+        for r in linhas:
+            # Printa o resultado de cada instancia
+            linha = (
+            f"{r['nome']:<{w_nome}} | "
+            f"{r['modo']:<{w_modo}} | "
+            f"{r['dimensoes']:<{w_dim}} | "
+            f"{r['itens']:<{w_itens}} | "
+            f"{r['valor']:<{w_obj}} | "
+            f"{r['ocupacao']:<{w_ocup}} | "
+            f"{r['tempo']:<{w_tempo}} | "
+            f"{r['parada']:<{w_parada}} | "
+            f"{r['semente']:<{w_semente}}\n"
+            )
+
+            out.write(linha)
+
+    # Tabela de uso dos operadores, para ver quais movimentos valem o custo em cada família
+    with open(os.path.join(pasta_teste, 'operadores.txt'), 'w') as out:
+        header = (
+            f"{'Instancia':<{w_nome}} | {'Operador':<10} | {'Chamadas':<10} | {'Aceitos':<10} | "
+            f"{'Melhorias':<10} | {'Tempo (s)':<10} | {'Prob. final':<11}\n"
+        )
+        out.write(header)
+        out.write("-" * len(header) + "\n")
+        for r in linhas:
+            if not r.get('operadores'):
+                continue
+            for nome, estat in r['operadores'].items():
+                out.write(
+                    f"{r['nome']:<{w_nome}} | {nome:<10} | {estat['chamadas']:<10} | {estat['aceitos']:<10} | "
+                    f"{estat['melhorias']:<10} | {estat['tempo']:<10.3f} | {r['probabilidades'][nome]:<11.3f}\n"
                 )
 
-                out.write(linha)
+    # Tempo e ganho da busca local, separados do RS (etapa a cada N níveis e etapa final)
+    with open(os.path.join(pasta_teste, 'busca_local.txt'), 'w') as out:
+        header = (
+            f"{'Instancia':<{w_nome}} | {'Etapa':<6} | {'Chamadas':<8} | {'Avaliações':<10} | "
+            f"{'Melhorias':<10} | {'Melhora':<12} | {'Tempo (s)':<10}\n"
+        )
+        out.write(header)
+        out.write("-" * len(header) + "\n")
+        for r in linhas:
+            if not r.get('busca_local'):
+                continue
+            for etapa, estat in r['busca_local'].items():
+                out.write(
+                    f"{r['nome']:<{w_nome}} | {etapa:<6} | {estat['chamadas']:<8} | {estat['avaliacoes']:<10} | "
+                    f"{estat['melhorias']:<10} | {estat['melhora']:<12.4f} | {estat['tempo']:<10.3f}\n"
+                )
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
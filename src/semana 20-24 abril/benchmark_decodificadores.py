@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import random
+import importlib.util
+
+# Compara o tempo médio de uma decodificação (ms) entre os motores de
+# posicionamento dos scripts desta pasta, sobre as mesmas permutações aleatórias.
+# Uso (a partir da raiz do repositório):
+#   python "src/semana 20-24 abril/benchmark_decodificadores.py" [prefixos...]
+# ex: python "src/semana 20-24 abril/benchmark_decodificadores.py" gcut apt
+
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+
+def carregar_script(nome_arquivo, nome_modulo):
+    # Os scripts têm '+' e '(' no nome, então não dá para usar o import normal
+    caminho = os.path.join(PASTA_SCRIPTS, nome_arquivo)
+    spec = importlib.util.spec_from_file_location(nome_modulo, caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome_modulo] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+BL = carregar_script("RS(HC)+BL+Rotacao_v2-3_operadores-consertado.py", "rs_hc_bl")
+HZZ = carregar_script("RS(HC)+HZZ+Rotacao_v2-3_operadores-consertado.py", "rs_hc_hzz")
+
+# O bitmap aloca uma matriz W x H, então só entra em contêineres pequenos
+LIMITE_BITMAP_BENCHMARK = 100000
+
+# (rótulo, função, argumentos extras, rótulo da referência para o ganho)
+VARIANTES = [
+    ("BL", BL.bottom_left_placement, {'usar_bitmap': False}, None),
+    ("BL+grade", BL.bottom_left_placement, {'usar_grade': True, 'usar_bitmap': False}, "BL"),
+    ("BL+bitmap", BL.bottom_left_placement, {'usar_bitmap': True}, "BL"),
+    ("HZZ", HZZ.horizontal_zig_zag_placement, {'usar_bitmap': False}, None),
+    ("HZZ+grade", HZZ.horizontal_zig_zag_placement, {'usar_grade': True, 'usar_bitmap': False}, "HZZ"),
+    ("HZZ+bitmap", HZZ.horizontal_zig_zag_placement, {'usar_bitmap': True}, "HZZ"),
+    ("MaxRects", BL.maximal_rectangles_placement, {}, "BL"),
+]
+
+def cronometrar(decoder, permutacoes, container_w, container_h, extras):
+    inicio = time.perf_counter()
+    for perm in permutacoes:
+        decoder(perm, container_w, container_h, **extras)
+    return (time.perf_counter() - inicio) / len(permutacoes) * 1000
+
+def main():
+    folder_path = './data/instancias/ins'
+    prefixos = tuple(sys.argv[1:]) or ('gcut', 'apt')
+    amostras = 20 # permutações aleatórias por instância
+    random.seed(0)
+
+    if not os.path.exists(folder_path):
+        print(f"Erro: Pasta {folder_path} não encontrada.")
+        return
+
+    w_nome = 13
+    w_col = 18
+    header = f"{'Instancia':<{w_nome}} | {'Itens':<6} | " + " | ".join(f"{v[0]:<{w_col}}" for v in VARIANTES)
+    print(header)
+    print("-" * len(header))
+
+    totais = {v[0]: 0.0 for v in VARIANTES}
+    totais_ref = {v[0]: 0.0 for v in VARIANTES} # tempo da referência nas mesmas instâncias
+    for filename in sorted(os.listdir(folder_path)):
+        if not (filename.endswith(".txt") and filename.startswith(prefixos)):
+            continue
+
+        inst = BL.load_instance(os.path.join(folder_path, filename))
+        permutacoes = [random.sample(inst.items, len(inst.items)) for _ in range(amostras)]
+
+        tempos = {}
+        colunas = []
+        for rotulo, decoder, extras, referencia in VARIANTES:
+            if extras.get('usar_bitmap') and inst.W * inst.H > LIMITE_BITMAP_BENCHMARK:
+                colunas.append(f"{'-':<{w_col}}")
+                continue
+            tempos[rotulo] = cronometrar(decoder, permutacoes, inst.W, inst.H, extras)
+            totais[rotulo] += tempos[rotulo]
+            if referencia is not None:
+                totais_ref[rotulo] += tempos[referencia]
+            celula = f"{tempos[rotulo]:.3f}ms"
+            if referencia is not None:
+                celula += f" ({tempos[referencia] / tempos[rotulo]:.1f}x)"
+            colunas.append(f"{celula:<{w_col}}")
+
+        print(f"{inst.name:<{w_nome}} | {len(inst.items):<6} | " + " | ".join(colunas))
+
+    # Ganho no tempo total somado de todas as instâncias
+    print("-" * len(header))
+    colunas = []
+    for rotulo, _, _, referencia in VARIANTES:
+        celula = f"{totais[rotulo]:.1f}ms"
+        if referencia is not None and totais[rotulo] > 0:
+            celula += f" ({totais_ref[rotulo] / totais[rotulo]:.1f}x)"
+        colunas.append(f"{celula:<{w_col}}")
+    print(f"{'Total':<{w_nome}} | {'':<6} | " + " | ".join(colunas))
+
+if __name__ == "__main__":
+    main()